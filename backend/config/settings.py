@@ -1,6 +1,9 @@
+import json
 import os
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -26,6 +29,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'tickets.tenancy.TenantMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -56,9 +60,44 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'postgres'),
         'HOST': os.environ.get('DB_HOST', 'db'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        # Persistent connections, so the ones opened by worker warm-up are reused
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Tenant shards: database aliases new organizations are hash-placed across.
+# Each extra alias reads <ALIAS>_DB_NAME / _DB_HOST / _DB_PORT / _DB_SCHEMA
+# and otherwise shares the default connection settings, so shards can be
+# separate databases, separate servers, or schemas in one database.
+TENANT_SHARDS = [s.strip() for s in os.environ.get('TENANT_SHARDS', 'default').split(',') if s.strip()]
+for _alias in TENANT_SHARDS:
+    if _alias in DATABASES:
+        continue
+    _prefix = _alias.upper()
+    DATABASES[_alias] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get(f'{_prefix}_DB_NAME', DATABASES['default']['NAME']),
+        'HOST': os.environ.get(f'{_prefix}_DB_HOST', DATABASES['default']['HOST']),
+        'PORT': os.environ.get(f'{_prefix}_DB_PORT', DATABASES['default']['PORT']),
+    }
+    if os.environ.get(f'{_prefix}_DB_SCHEMA'):
+        DATABASES[_alias]['OPTIONS'] = {'options': f"-c search_path={os.environ[f'{_prefix}_DB_SCHEMA']}"}
+
+DATABASE_ROUTERS = ['tickets.routers.TenantRouter']
+
+# Organization used when a request has no X-Organization header
+DEFAULT_ORGANIZATION = os.environ.get('DEFAULT_ORGANIZATION', 'default')
+# Let requests without an API token or login act as DEFAULT_ORGANIZATION.
+# Every other organization always requires a token or a member's login.
+TENANT_ANONYMOUS_ACCESS = os.environ.get('TENANT_ANONYMOUS_ACCESS', 'True') == 'True'
+# Also the delay move_tenant waits for every worker to see a shard flip
+ORGANIZATION_CACHE_SECONDS = int(os.environ.get('ORGANIZATION_CACHE_SECONDS', '10'))
+
+# Prime URL routing, DRF and the classifier in TicketsConfig.ready(); set by
+# gunicorn.conf.py so management commands never pay for it
+WARM_UP_ON_START = os.environ.get('DJANGO_WARM_UP', 'False') == 'True'
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
@@ -71,12 +110,95 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'x-organization', 'idempotency-key')
+
+# The React app logs in with the backend session (/api/auth/login/) and
+# sends the CSRF token on writes from its own origin
+FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:3000')
+LOGIN_REDIRECT_URL = FRONTEND_URL
+CSRF_TRUSTED_ORIGINS = [FRONTEND_URL]
 
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
 }
 
+# Shared by every gunicorn worker and the escalation worker, so a write in
+# one process invalidates facet counts for all of them. The table is created
+# by ``bootstrap`` (``createcachetable``). Per-process lookups that tolerate
+# a few seconds of staleness (organizations) use the "local" alias.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '10000'))},
+    },
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Upper bound on staleness of list facet counts (writes also invalidate them)
+FACET_CACHE_SECONDS = int(os.environ.get('FACET_CACHE_SECONDS', '30'))
+
+# Minutes an open ticket may wait at a priority before the escalation
+# worker bumps it (critical tickets are re-flagged). "<category>:<priority>"
+# keys override a priority for one category; 0 disables. Extend or override
+# with a JSON object in ESCALATION_THRESHOLDS_MINUTES.
+ESCALATION_THRESHOLDS_MINUTES = {
+    'low': 72 * 60,
+    'medium': 24 * 60,
+    'high': 4 * 60,
+    'critical': 60,
+    **json.loads(os.environ.get('ESCALATION_THRESHOLDS_MINUTES', '{}')),
+}
+# How often the escalation worker rebuilds its deadline heap from the database
+ESCALATION_REBUILD_SECONDS = int(os.environ.get('ESCALATION_REBUILD_SECONDS', '60'))
+
+# Admin changelists with more matching tickets than this skip facet counts
+ADMIN_FACET_MAX_ROWS = int(os.environ.get('ADMIN_FACET_MAX_ROWS', '100000'))
+
+# How long Idempotency-Key responses are kept for replay
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', '24'))
+# How long a duplicate waits for the request holding its key before 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS', '5'))
+# A key still pending after this long belongs to a dead request; retries
+# take it over. Must exceed the slowest idempotent view (classification).
+IDEMPOTENCY_PENDING_TIMEOUT_SECONDS = int(os.environ.get('IDEMPOTENCY_PENDING_TIMEOUT_SECONDS', '120'))
+
+# Rows fetched per server-side cursor round trip (and per CSV chunk /
+# Parquet row group / Arrow record batch) in ticket exports
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '10000'))
+
 # LLM configuration (set via environment variables)
 LLM_API_KEY = os.environ.get('LLM_API_KEY', '')
 LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'openai')
 OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-4o-mini')
+
+# Multi-provider routing: LLM_PROVIDERS=openai,local tries providers in
+# latency order and hedges slow calls. Each provider reads
+# LLM_<NAME>_KIND / _BASE_URL / _API_KEY / _MODEL, falling back to the
+# single-provider settings above for the "openai" entry.
+LLM_PROVIDERS = {
+    name: {
+        'kind': os.environ.get(f'LLM_{name.upper()}_KIND', name),
+        'base_url': os.environ.get(f'LLM_{name.upper()}_BASE_URL', ''),
+        'api_key': os.environ.get(f'LLM_{name.upper()}_API_KEY', LLM_API_KEY if name == 'openai' else ''),
+        'model': os.environ.get(f'LLM_{name.upper()}_MODEL', OPENAI_MODEL),
+    }
+    for name in [p.strip() for p in os.environ.get('LLM_PROVIDERS', LLM_PROVIDER).split(',') if p.strip()]
+}
+LLM_HEDGE_ENABLED = os.environ.get('LLM_HEDGE_ENABLED', 'True') == 'True'
+LLM_HEDGE_QUANTILE = float(os.environ.get('LLM_HEDGE_QUANTILE', '0.9'))
+LLM_HEDGE_DEFAULT_DELAY = float(os.environ.get('LLM_HEDGE_DEFAULT_DELAY', '2.0'))
+LLM_REQUEST_TIMEOUT = float(os.environ.get('LLM_REQUEST_TIMEOUT', '20'))
+
+# Prompt budgeting for classification
+LLM_DESCRIPTION_TOKEN_BUDGET = int(os.environ.get('LLM_DESCRIPTION_TOKEN_BUDGET', '400'))
+LLM_FEW_SHOT_EXAMPLES = int(os.environ.get('LLM_FEW_SHOT_EXAMPLES', '2'))
+# Provider kinds (e.g. "openai") whose system prompt is padded with reference
+# examples to clear OpenAI's 1024-token prompt caching threshold. Off by
+# default: padded tokens are still billed at a discount even on a cache hit
+LLM_PROMPT_CACHE_PREFIX_KINDS = [
+    kind.strip() for kind in os.environ.get('LLM_PROMPT_CACHE_PREFIX_KINDS', '').split(',') if kind.strip()
+]
+LLM_MAX_COMPLETION_TOKENS = int(os.environ.get('LLM_MAX_COMPLETION_TOKENS', '32'))
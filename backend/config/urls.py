@@ -3,5 +3,7 @@ from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Session login for the browser client; redirects to FRONTEND_URL
+    path('api/auth/', include('rest_framework.urls')),
     path('api/', include('tickets.urls')),
 ]
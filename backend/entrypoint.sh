@@ -2,32 +2,20 @@
 set -e
 
 echo "==> Waiting for PostgreSQL..."
-until pg_isready -h "$DB_HOST" -p "$DB_PORT" -U "$POSTGRES_USER"; do
-  sleep 1
+until pg_isready -q -h "$DB_HOST" -p "$DB_PORT" -U "$POSTGRES_USER"; do
+  sleep 0.5
 done
 echo "==> PostgreSQL is ready!"
 
-echo "==> Running migrations..."
-python manage.py migrate --noinput
+# Static files are collected at image build time; only collect when the
+# directory is empty (e.g. a fresh volume mounted over it).
+if [ -z "$(ls -A /app/staticfiles 2>/dev/null)" ]; then
+  echo "==> Collecting static files..."
+  python manage.py collectstatic --noinput
+fi
 
-echo "==> Collecting static files..."
-python manage.py collectstatic --noinput --clear
-
-echo "==> Creating admin superuser (if not exists)..."
-python manage.py shell -c "
-from django.contrib.auth import get_user_model
-User = get_user_model()
-if not User.objects.filter(username='admin').exists():
-    User.objects.create_superuser('admin', 'admin@example.com', 'admin123')
-    print('Superuser created: admin / admin123')
-else:
-    print('Superuser already exists')
-"
+echo "==> Migrating shards and ensuring the admin superuser..."
+python manage.py bootstrap
 
 echo "==> Starting Gunicorn..."
-exec gunicorn config.wsgi:application \
-  --bind 0.0.0.0:8000 \
-  --workers 3 \
-  --timeout 120 \
-  --access-logfile - \
-  --error-logfile -
+exec gunicorn config.wsgi:application -c gunicorn.conf.py
@@ -0,0 +1,33 @@
+"""
+Gunicorn settings for the backend container.
+
+With GUNICORN_PRELOAD=True (the default) the application is imported and
+warmed once in the master, and workers are forked from it already warm.
+Each worker then loads its per-process caches before serving.
+
+Workers are threaded (gthread): a worker's main thread keeps heartbeating
+to the arbiter while request threads run, so ``timeout`` does not cut off
+long streaming responses such as ``/api/tickets/export/``. A sync worker
+would be killed after ``timeout`` seconds mid-download.
+"""
+
+import os
+
+# Run TicketsConfig.ready() warm-up in the server process only, never in manage.py
+os.environ.setdefault('DJANGO_WARM_UP', 'True')
+
+bind = '0.0.0.0:8000'
+workers = int(os.environ.get('GUNICORN_WORKERS', '3'))
+worker_class = 'gthread'
+# Concurrent requests per worker; a long export occupies one of them
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+# With gthread this only applies to a worker that stops heartbeating
+timeout = 120
+accesslog = '-'
+errorlog = '-'
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+
+def post_worker_init(worker):
+    from tickets.warmup import warm_up_worker
+    warm_up_worker()
@@ -1,5 +1,190 @@
-from django.contrib import admin
-from .models import Ticket
+import calendar
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.options import IS_FACETS_VAR, IS_POPUP_VAR, TO_FIELD_VAR
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.contrib.postgres.search import SearchQuery
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.http import HttpResponseRedirect
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .models import SEARCH_CONFIG, SEARCH_VECTOR, Organization, OrganizationToken, Ticket
+from .tenancy import (
+    SESSION_KEY,
+    accessible_organizations,
+    can_access,
+    forget_organization,
+    get_current_organization,
+    get_organization,
+    tenant_tickets,
+)
+
+# Below this many rows an exact COUNT(*) is cheap, so estimates are not used.
+ESTIMATE_MIN_ROWS = 10_000
+
+# Query parameters that do not filter the changelist.
+UNFILTERED_PARAMS = {PAGE_VAR, ORDER_VAR, IS_FACETS_VAR, IS_POPUP_VAR, TO_FIELD_VAR}
+
+
+def estimated_count(queryset) -> Optional[int]:
+    """
+    Planner row estimate for ``queryset`` on PostgreSQL, or None elsewhere.
+
+    An unfiltered table reads ``pg_class.reltuples`` (kept current by
+    autovacuum); a filtered one uses the planner's estimate from EXPLAIN.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    if queryset.query.is_empty():
+        return 0
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table is first vacuumed or analyzed
+        return row[0] if row and row[0] >= 0 else None
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that trusts the planner's row estimate for large tables."""
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is None or estimate < ESTIMATE_MIN_ROWS:
+            return super().count
+        return estimate
+
+
+class IndexedDateQuerySet(QuerySet):
+    """
+    Queryset whose ``datetimes()`` walks the ``created_at`` index.
+
+    The admin date hierarchy asks for the distinct years, months or days
+    that have tickets. ``SELECT DISTINCT date_trunc(...)`` reads every
+    matching row; instead, each bucket is found with one index probe for
+    the first ticket at or after the bucket's start, so the cost is one
+    probe per bucket shown.
+    """
+
+    INDEXED_FIELDS = ('created_at',)
+
+    def datetimes(self, field_name, kind, order='ASC', tzinfo=None):
+        if field_name not in self.INDEXED_FIELDS or kind not in ('year', 'month', 'day'):
+            return super().datetimes(field_name, kind, order=order, tzinfo=tzinfo)
+
+        tz = tzinfo or timezone.get_current_timezone()
+        values = self.order_by(field_name).values_list(field_name, flat=True)
+        buckets = []
+        lower = None
+        while True:
+            probe = values if lower is None else values.filter(**{f'{field_name}__gte': lower})
+            first = probe.first()
+            if first is None:
+                break
+            local = timezone.localtime(first, tz)
+            start = local.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+            if kind == 'year':
+                start = start.replace(month=1, day=1)
+                following = start.replace(year=start.year + 1)
+            elif kind == 'month':
+                start = start.replace(day=1)
+                following = start + timedelta(days=calendar.monthrange(start.year, start.month)[1])
+            else:
+                following = start + timedelta(days=1)
+            buckets.append(timezone.make_aware(start, tz))
+            lower = timezone.make_aware(following, tz)
+        return buckets if order == 'ASC' else buckets[::-1]
+
+
+class OrganizationFilter(admin.SimpleListFilter):
+    """
+    Organization the ticket admin works on.
+
+    Browsers never send X-Organization, so picking an organization here
+    stores it in the session (see ``TicketAdmin.changelist_view``) and
+    TenantMiddleware resolves it into the tenant for later admin requests.
+    The filter never narrows the queryset itself; that is already the
+    tenant's.
+    """
+
+    title = 'organization'
+    parameter_name = SESSION_KEY
+
+    def lookups(self, request, model_admin):
+        return [(organization.slug, organization.name) for organization in accessible_organizations(request.user)]
+
+    def value(self):
+        organization = get_current_organization()
+        return organization.slug if organization is not None else None
+
+    def queryset(self, request, queryset):
+        return queryset
+
+    def get_facet_counts(self, pk_attname, filtered_qs):
+        return {}
+
+    def choices(self, changelist):
+        for slug, name in self.lookup_choices:
+            yield {
+                'selected': self.value() == slug,
+                'query_string': changelist.get_query_string({self.parameter_name: slug}, [PAGE_VAR]),
+                'display': name,
+            }
+
+
+class CappedFacetChangeList(ChangeList):
+    """Drop facet counts when the filtered result is too large to count cheaply."""
+
+    def get_results(self, request):
+        super().get_results(request)
+        if self.add_facets and self.result_count > settings.ADMIN_FACET_MAX_ROWS:
+            self.add_facets = False
+            messages.info(
+                request,
+                f"Counts are hidden for more than {settings.ADMIN_FACET_MAX_ROWS} tickets; "
+                f"narrow the filters to show them."
+            )
+
+
+class OrganizationTokenInline(admin.TabularInline):
+    """API tokens, listed for revocation; create them with ``create_org_token``."""
+
+    model = OrganizationToken
+    fields = ['name', 'created_at']
+    readonly_fields = ['name', 'created_at']
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Organization)
+class OrganizationAdmin(admin.ModelAdmin):
+    """Admin interface for tenants. Use ``move_tenant`` to change a shard."""
+    
+    list_display = ['slug', 'name', 'shard', 'read_only', 'created_at']
+    search_fields = ['slug', 'name']
+    readonly_fields = ['shard', 'created_at']
+    filter_horizontal = ['members']
+    inlines = [OrganizationTokenInline]
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        forget_organization(obj.slug)
 
 
 @admin.register(Ticket)
@@ -7,9 +192,12 @@ class TicketAdmin(admin.ModelAdmin):
     """Admin interface for Ticket model."""
     
     list_display = ['id', 'title', 'category', 'priority', 'status', 'created_at']
-    list_filter = ['category', 'priority', 'status', 'created_at']
+    list_filter = [OrganizationFilter, 'category', 'priority', 'status']
+    date_hierarchy = 'created_at'
     search_fields = ['title', 'description']
     readonly_fields = ['created_at', 'updated_at']
+    # The paginator's (possibly estimated) count is enough; skip the second COUNT(*).
+    show_full_result_count = False
     
     fieldsets = (
         ('Basic Information', {
@@ -25,5 +213,48 @@ class TicketAdmin(admin.ModelAdmin):
     )
     
     def get_queryset(self, request):
-        """Optimize queryset."""
-        return super().get_queryset(request).select_related()
+        """Tickets of the organization picked with OrganizationFilter; none until one is picked."""
+        if get_current_organization() is None:
+            return IndexedDateQuerySet(model=Ticket).none()
+        queryset = tenant_tickets()
+        return IndexedDateQuerySet(model=Ticket, query=queryset.query, using=queryset.db)
+    
+    def has_add_permission(self, request):
+        return get_current_organization() is not None and super().has_add_permission(request)
+    
+    def changelist_view(self, request, extra_context=None):
+        """Store an organization picked with OrganizationFilter in the session, then reload."""
+        slug = request.GET.get(SESSION_KEY)
+        if slug is not None:
+            organization = get_organization(slug)
+            if organization is not None and can_access(request.user, organization):
+                request.session[SESSION_KEY] = slug
+            else:
+                self.message_user(request, f"You are not a member of organization {slug}", messages.ERROR)
+            query = request.GET.copy()
+            del query[SESSION_KEY]
+            return HttpResponseRedirect(f"{request.path}?{query.urlencode()}" if query else request.path)
+        if get_current_organization() is None:
+            self.message_user(request, "Pick an organization to see its tickets", messages.WARNING)
+        return super().changelist_view(request, extra_context)
+    
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        """Estimate the total for unfiltered views instead of COUNT(*) over the whole table."""
+        if set(request.GET) <= UNFILTERED_PARAMS:
+            return EstimatedCountPaginator(queryset, per_page, orphans, allow_empty_first_page)
+        return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+    
+    def get_changelist(self, request, **kwargs):
+        return CappedFacetChangeList
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Full-text search over tix_search_idx on PostgreSQL; LIKE search elsewhere."""
+        if not search_term or connections[queryset.db].vendor != 'postgresql':
+            return super().get_search_results(request, queryset, search_term)
+        query = SearchQuery(search_term, config=SEARCH_CONFIG, search_type='websearch')
+        return queryset.annotate(document=SEARCH_VECTOR).filter(document=query), False
+    
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.organization = get_current_organization()
+        super().save_model(request, obj, form, change)
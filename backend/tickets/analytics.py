@@ -0,0 +1,172 @@
+"""
+Ticket lifecycle analytics.
+
+Records status/priority/category changes into the append-only
+``TicketEvent`` log and folds the durations they imply into per-day
+``TicketMetricDigest`` buckets. Reads merge the small digest rows, so the
+stats endpoint never scans the event log.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from .models import Ticket, TicketEvent, TicketMetricDigest
+from .tdigest import TDigest
+
+logger = logging.getLogger(__name__)
+
+TRACKED_FIELDS = (
+    TicketEvent.FIELD_STATUS,
+    TicketEvent.FIELD_PRIORITY,
+    TicketEvent.FIELD_CATEGORY,
+)
+
+DONE_STATUSES = (Ticket.STATUS_RESOLVED, Ticket.STATUS_CLOSED)
+
+SUMMARY_QUANTILES = (
+    ('p50_seconds', 0.5),
+    ('p90_seconds', 0.9),
+    ('p99_seconds', 0.99),
+)
+
+
+def snapshot(ticket: Ticket) -> Dict[str, str]:
+    """Capture the tracked field values of a ticket before it is modified."""
+    return {field: getattr(ticket, field) for field in TRACKED_FIELDS}
+
+
+def record_ticket_changes(ticket: Ticket, previous: Dict[str, str]) -> List[TicketEvent]:
+    """
+    Append events for every tracked field that differs from ``previous``
+    and update the duration digests they complete.
+
+    Must be called after the ticket has been saved, inside the same
+    transaction as the update. Events and digests are written to the
+    ticket's own database (its tenant's shard).
+    """
+    db = ticket._state.db
+    changed_at = ticket.updated_at or timezone.now()
+    events = [
+        TicketEvent(
+            ticket=ticket,
+            field=field,
+            old_value=previous[field],
+            new_value=getattr(ticket, field),
+            created_at=changed_at,
+        )
+        for field in TRACKED_FIELDS
+        if previous[field] != getattr(ticket, field)
+    ]
+    if not events:
+        return []
+
+    observations = []
+    status_event = next((e for e in events if e.field == TicketEvent.FIELD_STATUS), None)
+    if status_event is not None:
+        prior_status_events = TicketEvent.objects.using(db).filter(
+            ticket=ticket, field=TicketEvent.FIELD_STATUS
+        )
+        # Tickets are created open, so the first status change is the first response.
+        if not prior_status_events.exists():
+            observations.append(TicketMetricDigest.METRIC_FIRST_RESPONSE)
+        if (
+            status_event.new_value in DONE_STATUSES
+            and status_event.old_value not in DONE_STATUSES
+            and not prior_status_events.filter(new_value__in=DONE_STATUSES).exists()
+        ):
+            observations.append(TicketMetricDigest.METRIC_RESOLUTION)
+
+    TicketEvent.objects.using(db).bulk_create(events)
+
+    seconds = max((changed_at - ticket.created_at).total_seconds(), 0.0)
+    for metric in observations:
+        observe_duration(
+            metric,
+            organization_id=ticket.organization_id,
+            category=ticket.category,
+            priority=ticket.priority,
+            day=changed_at.date(),
+            seconds=seconds,
+            using=db,
+        )
+
+    return events
+
+
+def observe_duration(
+    metric: str,
+    organization_id: int,
+    category: str,
+    priority: str,
+    day,
+    seconds: float,
+    using: Optional[str] = None,
+) -> None:
+    """Fold one duration into its (organization, metric, day, category, priority) bucket."""
+    db = using or DEFAULT_DB_ALIAS
+    with transaction.atomic(using=db):
+        bucket, _ = TicketMetricDigest.objects.using(db).select_for_update().get_or_create(
+            organization_id=organization_id,
+            metric=metric,
+            day=day,
+            category=category,
+            priority=priority,
+        )
+        digest = TDigest.from_dict(bucket.digest)
+        digest.add(seconds)
+        bucket.count += 1
+        bucket.total_seconds += seconds
+        bucket.digest = digest.to_dict()
+        bucket.save(update_fields=['count', 'total_seconds', 'digest'])
+
+
+def duration_summary(
+    window_days: Optional[int] = None,
+    organization=None,
+) -> Dict[str, Dict[str, Dict[str, Dict]]]:
+    """
+    Merge digest buckets into per-category and per-priority summaries.
+
+    Returns ``{metric: {"by_category": {...}, "by_priority": {...}}}`` where
+    each leaf has count, mean and percentile durations in seconds.
+    Only the last ``window_days`` days are included when given, and only
+    ``organization``'s buckets (read from its shard) when given.
+    """
+    buckets = TicketMetricDigest.objects.only(
+        'metric', 'category', 'priority', 'count', 'total_seconds', 'digest'
+    )
+    if organization is not None:
+        buckets = buckets.using(organization.shard).filter(organization=organization)
+    if window_days:
+        since = timezone.now().date() - timedelta(days=window_days - 1)
+        buckets = buckets.filter(day__gte=since)
+
+    merged = defaultdict(lambda: {'count': 0, 'total': 0.0, 'digest': TDigest()})
+    for bucket in buckets.iterator():
+        digest = TDigest.from_dict(bucket.digest)
+        for group, key in (('by_category', bucket.category), ('by_priority', bucket.priority)):
+            acc = merged[(bucket.metric, group, key)]
+            acc['count'] += bucket.count
+            acc['total'] += bucket.total_seconds
+            acc['digest'].merge(digest)
+
+    summary = {
+        metric: {'by_category': {}, 'by_priority': {}}
+        for metric, _ in TicketMetricDigest.METRIC_CHOICES
+    }
+    for (metric, group, key), acc in merged.items():
+        entry = {
+            'count': acc['count'],
+            'mean_seconds': round(acc['total'] / acc['count'], 1) if acc['count'] else None,
+        }
+        for name, q in SUMMARY_QUANTILES:
+            value = acc['digest'].quantile(q)
+            entry[name] = round(value, 1) if value is not None else None
+        summary[metric][group][key] = entry
+
+    return summary
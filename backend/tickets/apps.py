@@ -1,7 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class TicketsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tickets'
     verbose_name = 'Support Tickets'
+
+    def ready(self):
+        """Warm up application servers before they take traffic (see ``tickets.warmup``)."""
+        if settings.WARM_UP_ON_START:
+            from .warmup import warm_up_process
+            warm_up_process()
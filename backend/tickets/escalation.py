@@ -0,0 +1,194 @@
+"""
+Automatic escalation of open tickets that wait too long.
+
+Every open ticket has a deadline: ``(escalated_at or created_at) +
+threshold(category, priority)``. When it passes, the ticket's priority is
+bumped one step (low -> medium -> high -> critical); a critical ticket is
+re-flagged instead, which restarts its clock and bumps
+``escalation_count``.
+
+``EscalationScheduler`` keeps one min-heap of deadlines per shard. The heap
+is rebuilt from the covering partial index on open tickets every
+``rebuild_interval`` seconds; between rebuilds a pass only pops entries
+that are due and escalates them with a few set-based UPDATEs, so its cost
+depends on the number of due tickets rather than the table size. Tickets
+created or changed since the last rebuild are picked up by the next one,
+so a ticket is escalated at most ``rebuild_interval`` late.
+"""
+
+import heapq
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import facets
+from .models import Organization, Ticket, TicketEvent
+
+logger = logging.getLogger(__name__)
+
+NEXT_PRIORITY = {
+    Ticket.PRIORITY_LOW: Ticket.PRIORITY_MEDIUM,
+    Ticket.PRIORITY_MEDIUM: Ticket.PRIORITY_HIGH,
+    Ticket.PRIORITY_HIGH: Ticket.PRIORITY_CRITICAL,
+    Ticket.PRIORITY_CRITICAL: Ticket.PRIORITY_CRITICAL,
+}
+
+# (deadline, ticket id, priority, anchor) - priority and anchor identify the
+# state the deadline was computed from, so stale entries are ignored.
+HeapEntry = Tuple[datetime, int, str, datetime]
+
+
+class EscalationPolicy:
+    """
+    Age thresholds from ESCALATION_THRESHOLDS_MINUTES.
+
+    Keys are a priority (``"high"``) or ``"<category>:<priority>"`` for a
+    per-category override; a missing or zero threshold disables escalation
+    for that combination.
+    """
+
+    def __init__(self, thresholds_minutes: Optional[Dict[str, float]] = None):
+        if thresholds_minutes is None:
+            thresholds_minutes = settings.ESCALATION_THRESHOLDS_MINUTES
+        self.thresholds = {
+            key: timedelta(minutes=minutes)
+            for key, minutes in thresholds_minutes.items()
+            if minutes
+        }
+
+    def threshold(self, category: str, priority: str) -> Optional[timedelta]:
+        return self.thresholds.get(f"{category}:{priority}", self.thresholds.get(priority))
+
+    def deadline(self, category: str, priority: str, anchor: datetime) -> Optional[datetime]:
+        threshold = self.threshold(category, priority)
+        return anchor + threshold if threshold is not None else None
+
+    def shortest(self) -> Optional[timedelta]:
+        return min(self.thresholds.values(), default=None)
+
+
+class EscalationScheduler:
+    """
+    Min-heaps of escalation deadlines for the open tickets on each shard.
+    """
+
+    def __init__(self, aliases: Iterable[str], policy: Optional[EscalationPolicy] = None,
+                 batch_size: int = 500):
+        self.aliases = list(dict.fromkeys(aliases))
+        self.policy = policy or EscalationPolicy()
+        self.batch_size = batch_size
+        self.heaps: Dict[str, List[HeapEntry]] = {alias: [] for alias in self.aliases}
+
+    def rebuild(self) -> int:
+        """Reload every heap from the open tickets; returns the number of scheduled tickets."""
+        total = 0
+        for alias in self.aliases:
+            rows = (
+                Ticket.objects.using(alias)
+                .filter(status=Ticket.STATUS_OPEN)
+                .order_by()
+                .values_list('id', 'category', 'priority', 'created_at', 'escalated_at')
+                .iterator(chunk_size=self.batch_size * 10)
+            )
+            heap = []
+            for ticket_id, category, priority, created_at, escalated_at in rows:
+                anchor = escalated_at or created_at
+                deadline = self.policy.deadline(category, priority, anchor)
+                if deadline is not None:
+                    heap.append((deadline, ticket_id, priority, anchor))
+            heapq.heapify(heap)
+            self.heaps[alias] = heap
+            total += len(heap)
+        return total
+
+    def next_deadline(self) -> Optional[datetime]:
+        return min((heap[0][0] for heap in self.heaps.values() if heap), default=None)
+
+    def run_due(self, now: Optional[datetime] = None) -> int:
+        """Escalate every ticket whose deadline has passed; returns how many were escalated."""
+        now = now or timezone.now()
+        frozen = None
+        escalated = 0
+        for alias, heap in self.heaps.items():
+            due = []
+            while heap and heap[0][0] <= now:
+                due.append(heapq.heappop(heap))
+            if not due:
+                continue
+            if frozen is None:
+                # Tenants being moved between shards must not be written to.
+                frozen = set(Organization.objects.filter(read_only=True).values_list('id', flat=True))
+            by_priority = defaultdict(list)
+            for _, ticket_id, priority, anchor in due:
+                by_priority[priority].append((ticket_id, anchor))
+            for priority, entries in by_priority.items():
+                for start in range(0, len(entries), self.batch_size):
+                    escalated += self._escalate(
+                        alias, priority, entries[start:start + self.batch_size], frozen, now
+                    )
+        return escalated
+
+    def _escalate(self, alias: str, priority: str, entries: List[Tuple[int, datetime]],
+                  frozen: set, now: datetime) -> int:
+        new_priority = NEXT_PRIORITY[priority]
+        anchors = dict(entries)
+
+        with transaction.atomic(using=alias):
+            # Re-check under lock: skip tickets claimed, closed, re-prioritised or
+            # already escalated since the heap was built, and rows locked by a
+            # concurrent edit. Anything skipped is rescheduled by the next rebuild.
+            rows = [
+                (ticket_id, organization_id, category)
+                for ticket_id, organization_id, category, created_at, escalated_at in (
+                    Ticket.objects.using(alias)
+                    .select_for_update(skip_locked=True)
+                    .filter(pk__in=anchors, status=Ticket.STATUS_OPEN, priority=priority)
+                    .exclude(organization_id__in=frozen)
+                    .values_list('id', 'organization_id', 'category', 'created_at', 'escalated_at')
+                )
+                if (escalated_at or created_at) == anchors[ticket_id]
+            ]
+            if not rows:
+                return 0
+            ids = [ticket_id for ticket_id, _, _ in rows]
+
+            Ticket.objects.using(alias).filter(pk__in=ids).update(
+                priority=new_priority,
+                escalated_at=now,
+                escalation_count=F('escalation_count') + 1,
+                updated_at=now,
+            )
+            if new_priority != priority:
+                TicketEvent.objects.using(alias).bulk_create([
+                    TicketEvent(
+                        ticket_id=ticket_id,
+                        field=TicketEvent.FIELD_PRIORITY,
+                        old_value=priority,
+                        new_value=new_priority,
+                        created_at=now,
+                    )
+                    for ticket_id in ids
+                ])
+                # Facet counts live in the shared cache, so this reaches the
+                # web workers; robust so a cache outage cannot stop the worker.
+                for organization_id in {organization_id for _, organization_id, _ in rows}:
+                    transaction.on_commit(
+                        lambda organization_id=organization_id: facets.invalidate(organization_id),
+                        using=alias,
+                        robust=True,
+                    )
+
+        heap = self.heaps[alias]
+        for ticket_id, _, category in rows:
+            deadline = self.policy.deadline(category, new_priority, now)
+            if deadline is not None:
+                heapq.heappush(heap, (deadline, ticket_id, new_priority, now))
+
+        logger.info(f"Escalated {len(ids)} {priority} tickets to {new_priority} on {alias}")
+        return len(ids)
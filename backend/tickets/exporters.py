@@ -0,0 +1,210 @@
+"""
+Streaming ticket exports for analytics (CSV, Parquet, Arrow IPC).
+
+Rows are read with a server-side cursor in fixed-size batches and encoded
+one batch at a time, so memory stays bounded by the batch size no matter
+how many tickets match. Parquet and Arrow need ``pyarrow``, which is
+imported only when one of those formats is requested.
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+from django.db import transaction
+from rest_framework.renderers import BaseRenderer
+
+EXPORT_FIELDS = [
+    'id',
+    'title',
+    'description',
+    'category',
+    'priority',
+    'status',
+    'created_at',
+    'updated_at',
+]
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+def iter_batches(queryset, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[Tuple]]:
+    """
+    Yield lists of row tuples in primary-key order.
+
+    ``iterator(chunk_size=...)`` uses a server-side cursor on PostgreSQL,
+    so only one batch is held in memory at a time. The cursor is opened
+    inside a transaction: in autocommit mode Django declares it WITH HOLD,
+    and PostgreSQL then materializes the whole result set at commit before
+    the first batch is fetched.
+    """
+    with transaction.atomic(using=queryset.db):
+        rows = queryset.order_by('id').values_list(*EXPORT_FIELDS).iterator(chunk_size=batch_size)
+        try:
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    return
+                yield batch
+        finally:
+            # Close the cursor before the transaction ends (e.g. client disconnects)
+            rows.close()
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file object that hands written bytes back to the caller.
+
+    Tracks the absolute position itself so writers that record file
+    offsets (Parquet footers) stay correct after each drain.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def pyarrow_available() -> bool:
+    """Whether the optional pyarrow dependency can be imported."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_csv(batches: Iterable[List[Tuple]]) -> Iterator[bytes]:
+    """Encode batches as CSV with a header row, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for batch in batches:
+        for row in batch:
+            writer.writerow(
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in row
+            )
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode('utf-8')
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ('id', pa.int64()),
+        ('title', pa.string()),
+        ('description', pa.string()),
+        ('category', pa.string()),
+        ('priority', pa.string()),
+        ('status', pa.string()),
+        ('created_at', pa.timestamp('us', tz='UTC')),
+        ('updated_at', pa.timestamp('us', tz='UTC')),
+    ])
+
+
+def _record_batches(batches: Iterable[List[Tuple]], schema):
+    import pyarrow as pa
+
+    for batch in batches:
+        columns = list(zip(*batch))
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema,
+        )
+
+
+def stream_parquet(batches: Iterable[List[Tuple]]) -> Iterator[bytes]:
+    """Encode batches as a Parquet file, one row group per batch."""
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for record_batch in _record_batches(batches, schema):
+            writer.write_batch(record_batch)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_arrow(batches: Iterable[List[Tuple]]) -> Iterator[bytes]:
+    """Encode batches as an Arrow IPC stream, one record batch per batch."""
+    import pyarrow as pa
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    try:
+        yield sink.drain()
+        for record_batch in _record_batches(batches, schema):
+            writer.write_batch(record_batch)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+# format -> (encoder, content type, file extension)
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv', 'csv'),
+    'parquet': (stream_parquet, 'application/vnd.apache.parquet', 'parquet'),
+    'arrow': (stream_arrow, 'application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+
+class _ExportRenderer(BaseRenderer):
+    """
+    Lets DRF content negotiation accept ``?format=`` for export formats.
+
+    The export view streams its body directly; these only render error
+    payloads, as JSON.
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data).encode('utf-8')
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class ParquetRenderer(_ExportRenderer):
+    media_type = 'application/vnd.apache.parquet'
+    format = 'parquet'
+
+
+class ArrowRenderer(_ExportRenderer):
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+
+
+EXPORT_RENDERERS = [CSVRenderer, ParquetRenderer, ArrowRenderer]
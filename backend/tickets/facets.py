@@ -0,0 +1,96 @@
+"""
+Facet counts for the ticket list filters.
+
+One grouped query over (category, priority, status) yields at most 64
+rows for the current search term; every facet is then derived from those
+rows in Python. Each facet counts tickets matching all *other* active
+filters, so the numbers show what picking that value would return.
+
+Grouped rows are cached per organization and search term in the shared
+``default`` cache and invalidated by replacing that organization's version
+token whenever tickets are written, so a write handled by one worker (or
+by the escalation worker) is seen by every other process.
+"""
+
+import hashlib
+import uuid
+from collections import Counter
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from .filters import apply_ticket_filters
+from .models import Ticket
+from .tenancy import current_organization_id, tenant_db, tenant_tickets
+
+FACET_FIELDS = ('category', 'priority', 'status')
+
+FACET_CHOICES = {
+    'category': Ticket.CATEGORY_CHOICES,
+    'priority': Ticket.PRIORITY_CHOICES,
+    'status': Ticket.STATUS_CHOICES,
+}
+
+def _version_key(organization_id: Optional[int] = None) -> str:
+    if organization_id is None:
+        organization_id = current_organization_id()
+    return f"ticket_facets:{organization_id}:version"
+
+
+def _new_version() -> str:
+    # Unique rather than incremented: two processes invalidating at once
+    # must not both write the same next number.
+    return uuid.uuid4().hex
+
+
+def invalidate(organization_id: Optional[int] = None) -> None:
+    """Mark an organization's facet counts (default: the current one's) stale after tickets are written."""
+    cache.set(_version_key(organization_id), _new_version(), timeout=None)
+
+
+def invalidate_on_commit() -> None:
+    """Invalidate the current organization's counts once the current transaction commits."""
+    # Bind the id now: the hook may run after the request's tenant context has ended.
+    organization_id = current_organization_id()
+    transaction.on_commit(lambda: invalidate(organization_id), using=tenant_db())
+
+
+def _grouped_counts(search: str):
+    version = cache.get_or_set(_version_key(), _new_version, timeout=None)
+    digest = hashlib.sha1(search.encode('utf-8')).hexdigest()
+    cache_key = f"ticket_facets:{current_organization_id()}:{version}:{digest}"
+
+    rows = cache.get(cache_key)
+    if rows is None:
+        queryset = apply_ticket_filters(tenant_tickets(), {'search': search})
+        rows = [
+            (row['category'], row['priority'], row['status'], row['count'])
+            for row in queryset.order_by().values(*FACET_FIELDS).annotate(count=Count('id'))
+        ]
+        cache.set(cache_key, rows, timeout=settings.FACET_CACHE_SECONDS)
+    return rows
+
+
+def ticket_facets(params) -> Dict[str, Dict[str, int]]:
+    """
+    Return ``{"category": {...}, "priority": {...}, "status": {...}}``
+    counts for the list filters in ``params``.
+    """
+    active = {field: params.get(field) for field in FACET_FIELDS}
+    rows = _grouped_counts(params.get('search') or '')
+
+    facets = {}
+    for position, field in enumerate(FACET_FIELDS):
+        counts = Counter()
+        for row in rows:
+            if all(
+                not active[other] or row[index] == active[other]
+                for index, other in enumerate(FACET_FIELDS)
+                if other != field
+            ):
+                counts[row[position]] += row[3]
+        facets[field] = {value: counts.get(value, 0) for value, _ in FACET_CHOICES[field]}
+    return facets
@@ -0,0 +1,44 @@
+"""
+Query-parameter filtering shared by the ticket list, export and
+management commands.
+"""
+
+from django.db.models import Q
+
+
+def apply_ticket_filters(queryset, params):
+    """
+    Filter a Ticket queryset by request-style parameters.
+
+    Supports:
+    - category=billing
+    - priority=high
+    - status=open
+    - search=database (searches title and description)
+
+    All filters can be combined. ``params`` is any mapping with ``.get``
+    (QueryDict or plain dict).
+    """
+    # Filter by category
+    category = params.get('category')
+    if category:
+        queryset = queryset.filter(category=category)
+
+    # Filter by priority
+    priority = params.get('priority')
+    if priority:
+        queryset = queryset.filter(priority=priority)
+
+    # Filter by status
+    status_param = params.get('status')
+    if status_param:
+        queryset = queryset.filter(status=status_param)
+
+    # Search in title and description
+    search = params.get('search')
+    if search:
+        queryset = queryset.filter(
+            Q(title__icontains=search) | Q(description__icontains=search)
+        )
+
+    return queryset
@@ -0,0 +1,196 @@
+"""
+Idempotency-Key handling for write endpoints.
+
+A request carrying ``Idempotency-Key`` is executed at most once per
+(endpoint, organization, key) within IDEMPOTENCY_KEY_TTL_HOURS. Retries with the same key
+and payload get the stored response back from a single indexed lookup;
+reusing a key with a different payload is rejected.
+
+The key row is claimed first, in its own short transaction, as *pending*
+(no status code yet), and completed with the response once the view has
+run. Concurrent duplicates find the pending row on the unique index and
+wait up to IDEMPOTENCY_WAIT_SECONDS for it to complete, then replay the
+stored response (or get 409 if it is still running). No transaction is
+held open while a slow view such as classification runs. A pending row
+older than IDEMPOTENCY_PENDING_TIMEOUT_SECONDS belongs to a request that
+died and may be taken over by a retry.
+
+Server errors, exceptions and responses marked with ``do_not_store`` (for
+example a classification that fell back to defaults) release the key so
+the client's retry runs the view again.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyRecord
+from .tenancy import current_organization_id, tenant_db
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+MAX_POLL_INTERVAL = 0.25
+
+
+def fingerprint(data) -> str:
+    """Stable hash of a parsed request payload."""
+    canonical = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def do_not_store(response: Response) -> Response:
+    """Mark a degraded response so its key is released instead of replayed on retry."""
+    response.idempotency_do_not_store = True
+    return response
+
+
+def _mismatch() -> Response:
+    return Response(
+        {'detail': f"{HEADER} was already used with a different request payload"},
+        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+    )
+
+
+def _replay(record: IdempotencyRecord) -> Response:
+    return Response(
+        record.response_body,
+        status=record.status_code,
+        headers={REPLAY_HEADER: 'true'},
+    )
+
+
+def _in_progress() -> Response:
+    response = Response(
+        {'detail': f"A request with this {HEADER} is still being processed"},
+        status=status.HTTP_409_CONFLICT
+    )
+    response['Retry-After'] = '1'
+    return response
+
+
+def _claim(db: str, scope: str, key: str, request_fingerprint: str):
+    """
+    Claim ``key`` as pending; returns ``(record, None)`` when claimed or
+    ``(None, response)`` with the replay, 422 or 409 to send instead.
+    """
+    wait_until = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    interval = 0.02
+    while True:
+        now = timezone.now()
+        # Fast path for retries: one lookup on the (scope, key) unique index.
+        record = IdempotencyRecord.objects.using(db).filter(scope=scope, key=key).first()
+        if record is not None and record.expires_at <= now:
+            IdempotencyRecord.objects.using(db).filter(pk=record.pk).delete()
+            record = None
+
+        if record is not None:
+            if record.fingerprint != request_fingerprint:
+                return None, _mismatch()
+            if record.status_code is not None:
+                logger.info(f"Replaying {scope} response for {HEADER} {key}")
+                return None, _replay(record)
+            stale = now - timedelta(seconds=settings.IDEMPOTENCY_PENDING_TIMEOUT_SECONDS)
+            if record.created_at < stale:
+                # The request that claimed the key died before completing it.
+                logger.warning(f"Taking over abandoned {scope} request for {HEADER} {key}")
+                IdempotencyRecord.objects.using(db).filter(
+                    pk=record.pk, status_code__isnull=True
+                ).delete()
+                continue
+            if time.monotonic() >= wait_until:
+                return None, _in_progress()
+            time.sleep(interval)
+            interval = min(interval * 2, MAX_POLL_INTERVAL)
+            continue
+
+        try:
+            with transaction.atomic(using=db):
+                record = IdempotencyRecord.objects.using(db).create(
+                    scope=scope,
+                    key=key,
+                    fingerprint=request_fingerprint,
+                    expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+                )
+        except IntegrityError:
+            # A concurrent twin claimed it first; wait for its response.
+            logger.info(f"Coalescing concurrent {scope} request for {HEADER} {key}")
+            continue
+        return record, None
+
+
+def idempotent(scope: str, atomic: bool = True):
+    """
+    Decorate a DRF view method so it honours the Idempotency-Key header.
+
+    Requests without the header run unchanged. Responses with status
+    < 500 are stored unless marked with ``do_not_store``; anything else
+    releases the key so the client can retry. With ``atomic`` the view's
+    writes commit together with the stored response; pass ``atomic=False``
+    for views that wait on external calls and write nothing that must be
+    de-duplicated.
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.headers.get(HEADER)
+            if not key:
+                return view_method(self, request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response(
+                    {'detail': f"{HEADER} cannot exceed {MAX_KEY_LENGTH} characters"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # Keys live on the tenant's shard, next to the rows the view writes.
+            db = tenant_db()
+            tenant_scope = f"{scope}:{current_organization_id()}"
+            record, response = _claim(db, tenant_scope, key, fingerprint(request.data))
+            if response is not None:
+                return response
+
+            completed = False
+            try:
+                with transaction.atomic(using=db) if atomic else nullcontext():
+                    response = view_method(self, request, *args, **kwargs)
+                    store = (
+                        response.status_code < 500
+                        and not getattr(response, 'idempotency_do_not_store', False)
+                    )
+                    if store:
+                        record.status_code = response.status_code
+                        record.response_body = response.data
+                        record.save(using=db, update_fields=['status_code', 'response_body'])
+                    elif atomic:
+                        transaction.set_rollback(True, using=db)
+                completed = store
+            finally:
+                if not completed:
+                    IdempotencyRecord.objects.using(db).filter(pk=record.pk).delete()
+            return response
+
+        return wrapper
+    return decorator
+
+
+def purge_expired() -> int:
+    """Delete expired keys on every shard; returns the number of rows removed."""
+    now = timezone.now()
+    total = 0
+    for alias in settings.TENANT_SHARDS:
+        deleted, _ = IdempotencyRecord.objects.using(alias).filter(expires_at__lte=now).delete()
+        total += deleted
+    return total
@@ -0,0 +1,327 @@
+"""
+LLM provider registry with latency-based routing and hedged requests.
+
+Each configured backend (OpenAI, any OpenAI-compatible endpoint, or a local
+model server) is wrapped in a provider that tracks its own recent latencies
+and failures. The router sends each request to the fastest healthy provider
+and, if it has not answered by that provider's p90 latency, fires the same
+request at the next provider and returns whichever answers first.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Optional
+from urllib import request, error
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderError(Exception):
+    """Raised when a provider fails to return a usable completion."""
+
+
+class Completion(NamedTuple):
+    """Result of one chat completion call."""
+    text: str
+    provider: str
+    usage: Optional[Dict[str, int]] = None
+    latency: float = 0.0
+    hedged: bool = False
+
+
+class LatencyTracker:
+    """
+    Rolling latency window plus a simple circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the provider is marked
+    unhealthy for ``cooldown`` seconds, then gets one trial request.
+    """
+
+    def __init__(self, window: int = 200, failure_threshold: int = 3, cooldown: float = 30.0):
+        self.samples = deque(maxlen=window)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self, seconds: float) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+            self.consecutive_failures = 0
+            self.open_until = 0.0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.open_until = time.monotonic() + self.cooldown
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.open_until
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency in seconds at quantile ``q``, or None with no samples."""
+        with self._lock:
+            if not self.samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(int(q * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+
+
+class LLMProvider:
+    """
+    Base class for chat-completion backends.
+
+    Subclasses implement ``complete`` and return a ``Completion`` carrying
+    the assistant message text and, when the backend reports it, token usage.
+    """
+
+    kind = None
+
+    def __init__(self, name: str, timeout: float = 20.0):
+        self.name = name
+        self.timeout = timeout
+        self.tracker = LatencyTracker()
+        # Sent instead of a leading system message, e.g. a longer prefix
+        # that clears this provider's prompt-cache threshold.
+        self.system_prompt: Optional[str] = None
+
+    @property
+    def is_configured(self) -> bool:
+        return True
+
+    def complete(self, messages: List[Dict[str, str]], max_tokens: int = 200) -> Completion:
+        raise NotImplementedError
+
+    def prepare(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Messages as sent to this provider, with ``system_prompt`` applied."""
+        if self.system_prompt is None or not messages or messages[0]['role'] != 'system':
+            return messages
+        return [{**messages[0], 'content': self.system_prompt}, *messages[1:]]
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.name}>"
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    Any endpoint implementing the OpenAI Chat Completions API.
+    """
+
+    kind = 'openai'
+    DEFAULT_BASE_URL = 'https://api.openai.com/v1'
+
+    def __init__(self, name: str, model: str, api_key: str = '', base_url: str = '',
+                 json_mode: bool = True, timeout: float = 20.0):
+        super().__init__(name, timeout=timeout)
+        self.model = model
+        self.api_key = api_key
+        self.base_url = (base_url or self.DEFAULT_BASE_URL).rstrip('/')
+        self.json_mode = json_mode
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.api_key)
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def complete(self, messages: List[Dict[str, str]], max_tokens: int = 200) -> Completion:
+        body = {
+            "model": self.model,
+            "temperature": 0,
+            "max_tokens": max_tokens,
+            "messages": self.prepare(messages),
+        }
+        if self.json_mode:
+            body["response_format"] = {"type": "json_object"}
+
+        req = request.Request(
+            url=f"{self.base_url}/chat/completions",
+            data=json.dumps(body).encode("utf-8"),
+            headers=self._headers(),
+            method="POST",
+        )
+        try:
+            with request.urlopen(req, timeout=self.timeout) as resp:
+                response_data = json.loads(resp.read().decode("utf-8"))
+            text = response_data["choices"][0]["message"]["content"].strip()
+        except error.HTTPError as e:
+            body = e.read().decode("utf-8", errors="ignore")
+            raise ProviderError(f"{self.name} HTTP error: {e.code} {body}") from e
+        except error.URLError as e:
+            raise ProviderError(f"{self.name} network error: {e}") from e
+        except (KeyError, IndexError, ValueError) as e:
+            raise ProviderError(f"{self.name} returned malformed response: {e}") from e
+
+        usage = response_data.get("usage") or {}
+        return Completion(
+            text=text,
+            provider=self.name,
+            usage={
+                'prompt_tokens': usage.get('prompt_tokens'),
+                'completion_tokens': usage.get('completion_tokens'),
+                'cached_tokens': (usage.get('prompt_tokens_details') or {}).get('cached_tokens'),
+            },
+        )
+
+
+class LocalModelProvider(OpenAICompatibleProvider):
+    """
+    Self-hosted model server (llama.cpp, vLLM, Ollama) exposing the
+    OpenAI-compatible API. No API key required.
+    """
+
+    kind = 'local'
+    DEFAULT_BASE_URL = 'http://localhost:8080/v1'
+
+    def __init__(self, name: str, model: str, api_key: str = '', base_url: str = '',
+                 json_mode: bool = False, timeout: float = 20.0):
+        super().__init__(name, model, api_key=api_key, base_url=base_url,
+                         json_mode=json_mode, timeout=timeout)
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.base_url)
+
+
+PROVIDER_CLASSES = {
+    OpenAICompatibleProvider.kind: OpenAICompatibleProvider,
+    LocalModelProvider.kind: LocalModelProvider,
+}
+
+
+def register_provider(provider_class) -> None:
+    """Make a provider class available to ``build_provider`` by its ``kind``."""
+    PROVIDER_CLASSES[provider_class.kind] = provider_class
+
+
+def build_provider(name: str, config: Dict) -> LLMProvider:
+    """Instantiate a provider from a settings entry."""
+    config = dict(config)
+    kind = config.pop('kind', name)
+    try:
+        provider_class = PROVIDER_CLASSES[kind]
+    except KeyError:
+        raise ValueError(f"Unknown LLM provider kind: {kind}")
+    return provider_class(name, **config)
+
+
+class ProviderRouter:
+    """
+    Routes completions across providers by observed latency, with hedging.
+    """
+
+    def __init__(self, providers: List[LLMProvider], hedge: bool = True,
+                 hedge_quantile: float = 0.9, default_hedge_delay: float = 2.0,
+                 max_workers: Optional[int] = None):
+        self.providers = providers
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.default_hedge_delay = default_hedge_delay
+        # Losing hedged calls keep running to completion; size the pool so
+        # they never starve new requests. A call queued behind them would
+        # count its wait against the hedge deadline and hedge needlessly.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(8, len(providers) * 8),
+            thread_name_prefix='llm-provider',
+        )
+
+    def ranked(self) -> List[LLMProvider]:
+        """
+        Healthy providers first, fastest median first. Providers with no
+        samples yet sort ahead so they get measured; unhealthy providers
+        are kept at the end as a last resort.
+        """
+        def key(provider):
+            median = provider.tracker.quantile(0.5)
+            return (not provider.tracker.healthy, median is not None, median or 0.0)
+        return sorted(self.providers, key=key)
+
+    def _call(self, provider: LLMProvider, messages: List[Dict[str, str]], max_tokens: int) -> Completion:
+        started = time.monotonic()
+        try:
+            result = provider.complete(messages, max_tokens=max_tokens)
+        except Exception:
+            provider.tracker.record_failure()
+            raise
+        latency = time.monotonic() - started
+        provider.tracker.record_success(latency)
+        return result._replace(latency=latency)
+
+    def hedge_delay(self, provider: LLMProvider) -> float:
+        """Seconds to wait on ``provider`` before firing a hedge request."""
+        observed = provider.tracker.quantile(self.hedge_quantile)
+        return observed if observed is not None else self.default_hedge_delay
+
+    def complete(self, messages: List[Dict[str, str]], max_tokens: int = 200) -> Completion:
+        """
+        Return the first successful completion.
+
+        Starts with the best-ranked provider; launches the next one when the
+        current leader passes its hedge deadline or fails. Raises
+        ProviderError only after every provider has failed.
+        """
+        candidates = self.ranked()
+        if not candidates:
+            raise ProviderError("No LLM providers configured")
+
+        pending = {}
+        errors = []
+
+        def launch_next():
+            provider = candidates.pop(0)
+            pending[self._executor.submit(self._call, provider, messages, max_tokens)] = provider
+            return provider
+
+        leader = launch_next()
+        deadline = self.hedge_delay(leader) if self.hedge and candidates else None
+        hedged = False
+
+        while pending:
+            done, _ = wait(list(pending), timeout=deadline, return_when=FIRST_COMPLETED)
+            if not done:
+                # Leader is slower than its p90: hedge with the next provider.
+                hedge = launch_next()
+                logger.info(f"Hedging LLM request: {leader.name} -> {hedge.name}")
+                hedged = True
+                deadline = None
+                continue
+
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    return future.result()._replace(hedged=hedged)
+                except Exception as e:
+                    logger.warning(f"LLM provider {provider.name} failed: {e}")
+                    errors.append(f"{provider.name}: {e}")
+
+            if not pending and candidates:
+                leader = launch_next()
+                deadline = self.hedge_delay(leader) if self.hedge and candidates else None
+            elif not candidates:
+                deadline = None
+
+        raise ProviderError("All LLM providers failed: " + "; ".join(errors))
+
+    def latency_snapshot(self) -> Dict[str, Dict]:
+        """Per-provider health and latency, for logging and diagnostics."""
+        return {
+            provider.name: {
+                'healthy': provider.tracker.healthy,
+                'samples': len(provider.tracker.samples),
+                'p50_seconds': provider.tracker.quantile(0.5),
+                'p90_seconds': provider.tracker.quantile(0.9),
+            }
+            for provider in self.providers
+        }
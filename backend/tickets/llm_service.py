@@ -1,74 +1,69 @@
 """
 LLM Service for intelligent ticket classification and prioritization.
 
-This module handles integration with LLM APIs (OpenAI) to automatically
-suggest categories and priorities for support tickets based on their descriptions.
+This module handles integration with LLM APIs (OpenAI, OpenAI-compatible
+endpoints and local model servers) to automatically suggest categories and
+priorities for support tickets based on their descriptions. Provider
+selection, latency tracking and hedging live in ``llm_providers``; prompt
+layout and token budgeting live in ``prompting``.
 """
 
 import logging
 import json
-from urllib import request, error
-from typing import Dict
+from typing import Any, Dict
 from django.conf import settings
+from django.db import transaction
+
+from .llm_providers import Completion, ProviderError, ProviderRouter, build_provider
+from .models import ClassificationCall
+from .prompting import CACHED_SYSTEM_PROMPT, SYSTEM_PROMPT, PromptBuilder, estimate_tokens
+from .tenancy import tenant_db
 
 logger = logging.getLogger(__name__)
 
 
 class LLMClassifier:
     """
-    Intelligent ticket classifier using OpenAI API.
+    Intelligent ticket classifier backed by one or more LLM providers.
     
     The classifier analyzes ticket descriptions to suggest:
     - Category: billing, technical, account, or general
     - Priority: low, medium, high, or critical
     """
     
-    CLASSIFICATION_PROMPT = """You are an expert support ticket classifier. Analyze the following support ticket description and classify it into the appropriate category and priority level.
-
-Ticket Description:
-{description}
-
-Categories:
-- billing: Issues related to payments, invoices, subscriptions, refunds, pricing
-- technical: Technical problems, bugs, errors, software issues, integration problems
-- account: Account access, login issues, password resets, account settings, profile updates
-- general: Questions, feature requests, feedback, or anything that doesn't fit the above
-
-Priority Levels:
-- critical: System down, security breach, data loss, complete service outage, revenue impact
-- high: Major functionality broken, significant business impact, many users affected
-- medium: Important but not urgent, moderate impact, workarounds available
-- low: Minor issues, cosmetic problems, feature requests, general questions
-
-Respond with ONLY a JSON object in this exact format (no markdown, no explanation):
-{{"category": "one_of_the_categories", "priority": "one_of_the_priorities"}}
-
-Examples:
-Description: "I can't log into my account, tried resetting password but didn't receive email"
-Response: {{"category": "account", "priority": "high"}}
-
-Description: "The dashboard is loading very slowly, takes 30+ seconds"
-Response: {{"category": "technical", "priority": "medium"}}
-
-Description: "I was charged twice for my subscription this month"
-Response: {{"category": "billing", "priority": "high"}}
-
-Description: "How do I export my data?"
-Response: {{"category": "general", "priority": "low"}}
-
-Now classify this ticket:
-"""
-
     def __init__(self):
-        self.api_key = settings.LLM_API_KEY
-        self.provider = settings.LLM_PROVIDER
-        self.model = settings.OPENAI_MODEL
-        self.is_configured = bool(self.api_key)
+        providers = []
+        for name, config in settings.LLM_PROVIDERS.items():
+            try:
+                provider = build_provider(name, {**config, 'timeout': settings.LLM_REQUEST_TIMEOUT})
+            except ValueError as e:
+                logger.warning(f"Skipping LLM provider {name}: {e}")
+                continue
+            if provider.is_configured:
+                if provider.kind in settings.LLM_PROMPT_CACHE_PREFIX_KINDS:
+                    provider.system_prompt = CACHED_SYSTEM_PROMPT
+                providers.append(provider)
+            else:
+                logger.warning(f"LLM provider {name} is not configured, skipping")
+        
+        self.router = ProviderRouter(
+            providers,
+            hedge=settings.LLM_HEDGE_ENABLED,
+            hedge_quantile=settings.LLM_HEDGE_QUANTILE,
+            default_hedge_delay=settings.LLM_HEDGE_DEFAULT_DELAY,
+        )
+        self.is_configured = bool(providers)
+        self.prompt_builder = PromptBuilder()
+        # Extra prompt tokens sent to providers that get the cache-sized prefix
+        self._padding = {
+            provider.name: estimate_tokens(CACHED_SYSTEM_PROMPT) - estimate_tokens(SYSTEM_PROMPT)
+            for provider in providers if provider.system_prompt is not None
+        }
         
         if not self.is_configured:
-            logger.warning("LLM API key not configured. Classification will return defaults.")
+            logger.warning("No LLM provider configured. Classification will return defaults.")
     
-    def classify_ticket(self, description: str) -> Dict[str, str]:
+    def classify_ticket(self, description: str) -> Dict[str, Any]:
         """
         Classify a ticket description into category and priority.
         
@@ -77,7 +72,8 @@ Now classify this ticket:
             
         Returns:
             Dictionary with 'suggested_category' and 'suggested_priority'
-            Falls back to defaults if LLM is unavailable or fails
+            Falls back to defaults if LLM is unavailable or fails; the
+            defaults also carry 'fallback': True
         """
         if not self.is_configured:
             logger.info("LLM not configured, using default classification")
@@ -88,50 +84,27 @@ Now classify this ticket:
             return self._get_default_classification()
         
         try:
-            if self.provider == 'openai':
-                return self._classify_with_openai(description)
-            else:
-                logger.warning(f"Unknown LLM provider: {self.provider}")
-                return self._get_default_classification()
-                
+            return self._classify_with_router(description)
         except Exception as e:
             logger.error(f"LLM classification failed: {str(e)}", exc_info=True)
             return self._get_default_classification()
     
-    def _classify_with_openai(self, description: str) -> Dict[str, str]:
+    def _classify_with_router(self, description: str) -> Dict[str, str]:
         """
-        Use OpenAI Chat Completions API for classification.
+        Send the classification prompt to the fastest healthy provider,
+        hedging to a second provider if the first is slow.
         """
         try:
-            prompt = self.CLASSIFICATION_PROMPT.format(description=description)
-
-            payload = json.dumps({
-                "model": self.model,
-                "temperature": 0,
-                "max_tokens": 200,
-                "messages": [
-                    {"role": "system", "content": "You are a strict JSON classifier."},
-                    {"role": "user", "content": prompt},
-                ],
-                "response_format": {"type": "json_object"},
-            }).encode("utf-8")
-
-            req = request.Request(
-                url="https://api.openai.com/v1/chat/completions",
-                data=payload,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {self.api_key}",
-                },
-                method="POST",
+            messages, estimated_tokens = self.prompt_builder.build(description)
+            
+            completion = self.router.complete(
+                messages,
+                max_tokens=settings.LLM_MAX_COMPLETION_TOKENS,
             )
-            with request.urlopen(req, timeout=20) as resp:
-                response_data = json.loads(resp.read().decode("utf-8"))
-
-            response_text = response_data["choices"][0]["message"]["content"].strip()
-            logger.info(f"LLM raw response: {response_text}")
+            logger.info(f"LLM raw response from {completion.provider}: {completion.text}")
+            self._record_usage(completion, estimated_tokens)
 
-            result = json.loads(response_text)
+            result = json.loads(completion.text)
             
             # Validate and return
             category = result.get('category', 'general')
@@ -159,24 +132,40 @@ Now classify this ticket:
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM JSON response: {e}")
             return self._get_default_classification()
-        except error.HTTPError as e:
-            body = e.read().decode("utf-8", errors="ignore")
-            logger.error(f"OpenAI HTTP error: {e.code} {body}")
-            return self._get_default_classification()
-        except error.URLError as e:
-            logger.error(f"OpenAI network error: {e}")
+        except ProviderError as e:
+            logger.error(f"LLM provider error: {e}")
             return self._get_default_classification()
         except Exception as e:
-            logger.error(f"OpenAI API error: {str(e)}", exc_info=True)
+            logger.error(f"LLM API error: {str(e)}", exc_info=True)
             return self._get_default_classification()
     
-    def _get_default_classification(self) -> Dict[str, str]:
+    def _record_usage(self, completion: Completion, estimated_tokens: int) -> None:
+        """Persist token counts for this call; never fails classification."""
+        usage = completion.usage or {}
+        try:
+            # Savepoint so a failed insert cannot poison an enclosing transaction
+            db = tenant_db()
+            with transaction.atomic(using=db):
+                ClassificationCall.objects.using(db).create(
+                    provider=completion.provider,
+                    estimated_prompt_tokens=estimated_tokens + self._padding.get(completion.provider, 0),
+                    prompt_tokens=usage.get('prompt_tokens'),
+                    cached_tokens=usage.get('cached_tokens'),
+                    completion_tokens=usage.get('completion_tokens'),
+                    latency_ms=int(completion.latency * 1000),
+                    hedged=completion.hedged,
+                )
+        except Exception as e:
+            logger.warning(f"Could not record classification usage: {e}")
+    
+    def _get_default_classification(self) -> Dict[str, Any]:
         """
         Return sensible defaults when LLM is unavailable.
         """
         return {
             'suggested_category': 'general',
-            'suggested_priority': 'medium'
+            'suggested_priority': 'medium',
+            'fallback': True,
         }
 
 
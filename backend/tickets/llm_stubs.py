@@ -0,0 +1,103 @@
+"""
+Local stand-ins for OpenAI-compatible model servers.
+
+``StubLLMServer`` answers ``POST /v1/chat/completions`` on a loopback port
+after a configurable delay, optionally stalling a fraction of calls or
+failing every call. ``benchmark_providers`` and the provider tests use it
+to exercise routing, hedging and the circuit breaker without network
+access or API keys.
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DEFAULT_REPLY = '{"category": "technical", "priority": "medium"}'
+
+
+class StubLLMServer:
+    """
+    Threaded HTTP server with a latency model of
+    ``latency + uniform(0, jitter)``, plus ``stall_seconds`` on a
+    ``stall_rate`` fraction of calls. Attributes may be changed while the
+    server is running.
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, stall_rate: float = 0.0,
+                 stall_seconds: float = 3.0, fail: bool = False, reply: str = DEFAULT_REPLY,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.fail = fail
+        self.reply = reply
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def delay(self) -> float:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            if self._random.random() < self.stall_rate:
+                delay += self.stall_seconds
+        return delay
+
+    def start(self) -> 'StubLLMServer':
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                time.sleep(stub.delay())
+                if stub.fail:
+                    status, payload = 500, {"error": {"message": "stub failure"}}
+                else:
+                    status, payload = 200, {
+                        "choices": [{"message": {"role": "assistant", "content": stub.reply}}],
+                        "usage": {"prompt_tokens": 120, "completion_tokens": 12},
+                    }
+                body = json.dumps(payload).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The router gave up on this call (hedge won or timeout)
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
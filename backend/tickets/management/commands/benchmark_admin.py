@@ -0,0 +1,136 @@
+"""
+Benchmark the ticket admin changelist on a large table.
+
+Usage:
+    python manage.py benchmark_admin --rows 1000000
+    python manage.py benchmark_admin --rows 1000000 --runs 5
+
+Tops the default organization up to ``--rows`` synthetic tickets spread
+over about three years (PostgreSQL only, via generate_series), runs
+ANALYZE, then renders each changelist scenario with the shipped
+TicketAdmin and with stock ModelAdmin behaviour (exact counts, LIKE
+search, DISTINCT-based date hierarchy) and prints the median render time
+and query count of each.
+"""
+
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, reset_queries
+from django.test import RequestFactory
+
+from tickets.admin import TicketAdmin
+from tickets.models import Ticket
+from tickets.tenancy import get_organization, tenant_context, tenant_tickets
+
+SCENARIOS = [
+    ('unfiltered', {}),
+    ('unfiltered + facets', {'_facets': 'True'}),
+    ('search', {'q': 'refund'}),
+    ('status filter', {'status__exact': 'open'}),
+    ('date: months', {'created_at__year': None}),
+    ('date: days', {'created_at__year': None, 'created_at__month': None}),
+]
+
+SEED_SQL = """
+INSERT INTO tickets (
+    organization_id, title, description, category, priority, status,
+    created_at, updated_at, escalation_count
+)
+SELECT
+    %(organization_id)s,
+    'Ticket ' || g,
+    'Customer reports '
+        || (ARRAY['login failure', 'payment declined', 'slow dashboard', 'password reset',
+                  'invoice missing', 'server error', 'refund request', 'account locked'])[1 + g %% 8]
+        || ' on order ' || g,
+    (ARRAY['billing', 'technical', 'account', 'general'])[1 + g %% 4],
+    (ARRAY['low', 'medium', 'high', 'critical'])[1 + (g / 7) %% 4],
+    (ARRAY['open', 'in_progress', 'resolved', 'closed'])[1 + (g / 3) %% 4],
+    now() - g * interval '90 seconds',
+    now() - g * interval '90 seconds',
+    0
+FROM generate_series(%(start)s, %(stop)s) AS g
+"""
+
+
+class BaselineTicketAdmin(admin.ModelAdmin):
+    """The previous changelist options plus Django's own date hierarchy."""
+
+    list_display = ['id', 'title', 'category', 'priority', 'status', 'created_at']
+    list_filter = ['category', 'priority', 'status', 'created_at']
+    date_hierarchy = 'created_at'
+    search_fields = ['title', 'description']
+
+    def get_queryset(self, request):
+        return tenant_tickets()
+
+
+class Command(BaseCommand):
+    help = "Time the ticket admin changelist against the previous configuration."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--runs', type=int, default=3)
+
+    def seed(self, organization, rows):
+        existing = tenant_tickets().count()
+        if existing >= rows:
+            return
+        self.stdout.write(f"Inserting {rows - existing} tickets...")
+        with connections[organization.shard].cursor() as cursor:
+            cursor.execute(SEED_SQL, {
+                'organization_id': organization.id,
+                'start': existing + 1,
+                'stop': rows,
+            })
+            cursor.execute("ANALYZE tickets")
+
+    def render(self, model_admin, user, params):
+        request = RequestFactory().get('/admin/tickets/ticket/', params)
+        request.user = user
+        request._messages = CookieStorage(request)
+        reset_queries()
+        started = time.perf_counter()
+        response = model_admin.changelist_view(request)
+        response.render()
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            raise CommandError(f"Changelist returned {response.status_code} for {params}")
+        return elapsed, len(connections[tenant_tickets().db].queries)
+
+    def handle(self, *args, **options):
+        organization = get_organization(settings.DEFAULT_ORGANIZATION)
+        if organization is None:
+            raise CommandError("Run migrations first; the default organization is missing")
+        if connections[organization.shard].vendor != 'postgresql':
+            raise CommandError("benchmark_admin needs PostgreSQL")
+        connections[organization.shard].force_debug_cursor = True
+
+        user = get_user_model()(username='benchmark', is_staff=True, is_superuser=True, is_active=True)
+        admins = {
+            'before': BaselineTicketAdmin(Ticket, admin.site),
+            'after': TicketAdmin(Ticket, admin.site),
+        }
+
+        with tenant_context(organization):
+            self.seed(organization, options['rows'])
+            newest = tenant_tickets().order_by('-created_at').values_list('created_at', flat=True).first()
+
+            self.stdout.write(f"{tenant_tickets().count()} tickets; median of {options['runs']} runs")
+            self.stdout.write(f"{'scenario':<22}{'before ms':>12}{'queries':>9}{'after ms':>12}{'queries':>9}")
+            for name, params in SCENARIOS:
+                params = {
+                    key: value if value is not None else str(getattr(newest, key.split('__')[1]))
+                    for key, value in params.items()
+                }
+                row = f"{name:<22}"
+                for label in ('before', 'after'):
+                    runs = [self.render(admins[label], user, params) for _ in range(options['runs'])]
+                    row += f"{statistics.median(r[0] for r in runs):>12.0f}{runs[-1][1]:>9}"
+                self.stdout.write(row)
@@ -0,0 +1,216 @@
+"""
+Benchmark classification prompt size, cache eligibility and latency.
+
+Compares the original single-message prompt, which repeated the full
+rubric and four fixed examples on every call, against the two
+``PromptBuilder`` layouts: the compact rubric-only prefix (the default)
+and the cache-sized prefix sent to LLM_PROMPT_CACHE_PREFIX_KINDS.
+
+Usage:
+    python manage.py benchmark_prompts
+    python manage.py benchmark_prompts --limit 500 --live
+    python manage.py benchmark_prompts --cached-price 0.25
+    python manage.py benchmark_prompts --recorded-days 7
+
+``--live`` sends every description through the configured providers with
+each layout (twice, so the second pass can hit the provider cache) and
+reports latency and the share of prompt tokens served from cache; the
+provider's own token counts there are authoritative, the others are local
+estimates.
+``--recorded-days`` summarizes the provider-reported usage that
+production calls stored in ``classification_calls``.
+"""
+
+import statistics
+import time
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+from tickets.llm_service import get_classifier
+from tickets.models import ClassificationCall, Ticket
+from tickets.prompting import PROVIDER_CACHE_MIN_TOKENS, PromptBuilder, estimate_tokens
+
+LEGACY_SYSTEM = "You are a strict JSON classifier."
+
+LEGACY_PROMPT = """You are an expert support ticket classifier. Analyze the following support ticket description and classify it into the appropriate category and priority level.
+
+Ticket Description:
+{description}
+
+Categories:
+- billing: Issues related to payments, invoices, subscriptions, refunds, pricing
+- technical: Technical problems, bugs, errors, software issues, integration problems
+- account: Account access, login issues, password resets, account settings, profile updates
+- general: Questions, feature requests, feedback, or anything that doesn't fit the above
+
+Priority Levels:
+- critical: System down, security breach, data loss, complete service outage, revenue impact
+- high: Major functionality broken, significant business impact, many users affected
+- medium: Important but not urgent, moderate impact, workarounds available
+- low: Minor issues, cosmetic problems, feature requests, general questions
+
+Respond with ONLY a JSON object in this exact format (no markdown, no explanation):
+{{"category": "one_of_the_categories", "priority": "one_of_the_priorities"}}
+
+Examples:
+Description: "I can't log into my account, tried resetting password but didn't receive email"
+Response: {{"category": "account", "priority": "high"}}
+
+Description: "The dashboard is loading very slowly, takes 30+ seconds"
+Response: {{"category": "technical", "priority": "medium"}}
+
+Description: "I was charged twice for my subscription this month"
+Response: {{"category": "billing", "priority": "high"}}
+
+Description: "How do I export my data?"
+Response: {{"category": "general", "priority": "low"}}
+
+Now classify this ticket:
+"""
+
+SAMPLE_DESCRIPTIONS = [
+    "I can't log into my account, tried resetting password but didn't receive email",
+    "The dashboard is loading very slowly, takes 30+ seconds",
+    "I was charged twice for my subscription this month",
+    "How do I export my data?",
+    "Our production API has been returning 502 errors since this morning. "
+    "All customers on the EU cluster are affected and checkout fails. " * 20,
+]
+
+
+def legacy_messages(description):
+    return [
+        {"role": "system", "content": LEGACY_SYSTEM},
+        {"role": "user", "content": LEGACY_PROMPT.format(description=description)},
+    ]
+
+
+def summarize(values):
+    ordered = sorted(values)
+    return {
+        'mean': statistics.fmean(ordered),
+        'p50': ordered[len(ordered) // 2],
+        'max': ordered[-1],
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare legacy vs compact vs padded classification prompts by tokens (and latency with --live)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=200, help='Stored tickets to sample')
+        parser.add_argument('--live', action='store_true', help='Also call the configured providers')
+        parser.add_argument(
+            '--cached-price', type=float, default=0.5,
+            help='Price of a cached prompt token as a fraction of an uncached one (OpenAI gpt-4o: 0.5)'
+        )
+        parser.add_argument(
+            '--recorded-days', type=int, default=0,
+            help='Summarize provider-reported usage stored over the last N days'
+        )
+
+    def handle(self, *args, **options):
+        descriptions = list(
+            Ticket.objects.order_by('-created_at').values_list('description', flat=True)[:options['limit']]
+        ) or SAMPLE_DESCRIPTIONS
+        layouts = {
+            'legacy': (legacy_messages, 0),
+        }
+        for label, cache_prefix in (('compact', False), ('padded', True)):
+            builder = PromptBuilder(cache_prefix=cache_prefix)
+            layouts[label] = (lambda d, builder=builder: builder.build(d)[0], builder.prefix_tokens())
+
+        self.stdout.write(f"Descriptions: {len(descriptions)}")
+        self.stdout.write(
+            f"{'layout':<9}{'mean':>7}{'p50':>7}{'max':>7}{'prefix':>8}{'billed on hit':>15}"
+        )
+        for label, (build, prefix) in layouts.items():
+            tokens = summarize([
+                sum(estimate_tokens(m['content']) + 4 for m in build(description))
+                for description in descriptions
+            ])
+            cacheable = prefix if prefix >= PROVIDER_CACHE_MIN_TOKENS else 0
+            billed = tokens['mean'] - cacheable * (1 - options['cached_price'])
+            self.stdout.write(
+                f"{label:<9}{tokens['mean']:>7.0f}{tokens['p50']:>7}{tokens['max']:>7}"
+                f"{prefix:>8}{billed:>15.0f}"
+            )
+        self.stdout.write(
+            f"Token counts are local estimates. Only prefixes of at least {PROVIDER_CACHE_MIN_TOKENS} "
+            f"tokens are cached by OpenAI; 'billed on hit' is the mean in full-price tokens when the "
+            f"prefix is served from cache at {options['cached_price']:.0%} of the price. Cache hits are "
+            f"best-effort and expire when traffic is idle, so a miss bills the full mean."
+        )
+
+        if options['recorded_days']:
+            self.recorded(options['recorded_days'])
+
+        if not options['live']:
+            return
+
+        classifier = get_classifier()
+        if not classifier.is_configured:
+            self.stderr.write("No LLM provider configured; skipping live run.")
+            return
+
+        # Each layout sets the system prompt itself
+        for provider in classifier.router.providers:
+            provider.system_prompt = None
+
+        for label, (build, _) in layouts.items():
+            for run in ('cold', 'warm'):
+                latencies = []
+                prompt_tokens = 0
+                cached_tokens = 0
+                for description in descriptions:
+                    started = time.monotonic()
+                    completion = classifier.router.complete(
+                        build(description), max_tokens=settings.LLM_MAX_COMPLETION_TOKENS
+                    )
+                    latencies.append(time.monotonic() - started)
+                    usage = completion.usage or {}
+                    prompt_tokens += usage.get('prompt_tokens') or 0
+                    cached_tokens += usage.get('cached_tokens') or 0
+                timing = summarize(latencies)
+                line = (
+                    f"{label:8} {run}: latency mean {timing['mean'] * 1000:.0f}ms  "
+                    f"p50 {timing['p50'] * 1000:.0f}ms  max {timing['max'] * 1000:.0f}ms"
+                )
+                if prompt_tokens:
+                    line += (
+                        f"  provider prompt tokens mean {prompt_tokens / len(descriptions):.0f}"
+                        f"  cached {cached_tokens / prompt_tokens:.0%}"
+                    )
+                self.stdout.write(line)
+
+    def recorded(self, days):
+        """Cache hit ratio and latency of stored production calls, with and without cache hits."""
+        since = timezone.now() - timedelta(days=days)
+        self.stdout.write(f"Recorded calls over the last {days} days:")
+        for alias in dict.fromkeys(['default', *settings.TENANT_SHARDS]):
+            calls = ClassificationCall.objects.using(alias).filter(created_at__gte=since)
+            totals = calls.aggregate(
+                calls=Count('id'),
+                prompt=Sum('prompt_tokens'),
+                cached=Sum('cached_tokens'),
+                hit_latency=Avg('latency_ms', filter=Q(cached_tokens__gt=0)),
+                miss_latency=Avg('latency_ms', filter=Q(cached_tokens=0) | Q(cached_tokens__isnull=True)),
+            )
+            if not totals['calls']:
+                self.stdout.write(f"  {alias}: no calls")
+                continue
+            ratio = (totals['cached'] or 0) / totals['prompt'] if totals['prompt'] else 0.0
+
+            def ms(value):
+                return f"{value:.0f}ms" if value is not None else 'n/a'
+
+            self.stdout.write(
+                f"  {alias}: {totals['calls']} calls, {ratio:.0%} of prompt tokens cached, "
+                f"mean latency {ms(totals['hit_latency'])} with a cache hit vs "
+                f"{ms(totals['miss_latency'])} without"
+            )
@@ -0,0 +1,106 @@
+"""
+Benchmark provider routing and hedging against local stub servers.
+
+Usage:
+    python manage.py benchmark_providers
+    python manage.py benchmark_providers --requests 1000 --stall-rate 0.05 --stall-seconds 3
+
+Starts two ``StubLLMServer`` instances (see ``tickets.llm_stubs``) that
+answer in ``--latency`` plus jitter and stall for ``--stall-seconds`` on a
+``--stall-rate`` fraction of calls, then sends the same request stream
+through three routers: the primary alone, both providers without hedging,
+and both providers with hedging. Prints latency percentiles for each.
+No API key or network access is needed.
+"""
+
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from tickets.llm_providers import LocalModelProvider, ProviderRouter
+from tickets.llm_stubs import StubLLMServer
+
+MESSAGES = [
+    {"role": "system", "content": "Classify the ticket."},
+    {"role": "user", "content": "The dashboard takes 30 seconds to load."},
+]
+
+
+def percentile(ordered, q):
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = "Compare p50/p99 latency with and without hedging using local stub LLM servers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--latency', type=float, default=0.08, help="Base stub latency in seconds")
+        parser.add_argument('--jitter', type=float, default=0.04)
+        parser.add_argument('--stall-rate', type=float, default=0.05)
+        parser.add_argument('--stall-seconds', type=float, default=3.0)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def run(self, router, options):
+        def one(_):
+            started = time.monotonic()
+            completion = router.complete(MESSAGES)
+            return time.monotonic() - started, completion.hedged
+
+        # Warm the latency windows so hedge deadlines come from observed p90
+        for _ in range(20):
+            router.complete(MESSAGES)
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(one, range(options['requests'])))
+        latencies = sorted(latency for latency, _ in results)
+        return {
+            'p50': percentile(latencies, 0.5),
+            'p90': percentile(latencies, 0.9),
+            'p99': percentile(latencies, 0.99),
+            'max': latencies[-1],
+            'mean': statistics.fmean(latencies),
+            'hedged': sum(1 for _, hedged in results if hedged) / len(results),
+        }
+
+    def handle(self, *args, **options):
+        stub_options = {
+            'latency': options['latency'],
+            'jitter': options['jitter'],
+            'stall_rate': options['stall_rate'],
+            'stall_seconds': options['stall_seconds'],
+        }
+        with StubLLMServer(seed=options['seed'], **stub_options) as primary, \
+                StubLLMServer(seed=options['seed'] + 1, **stub_options) as secondary:
+
+            workers = options['concurrency'] * 4
+
+            def providers():
+                timeout = options['stall_seconds'] + 5
+                return [
+                    LocalModelProvider('primary', 'stub', base_url=primary.base_url, timeout=timeout),
+                    LocalModelProvider('secondary', 'stub', base_url=secondary.base_url, timeout=timeout),
+                ]
+
+            scenarios = [
+                ('single provider', ProviderRouter(providers()[:1], hedge=False, max_workers=workers)),
+                ('two, no hedging', ProviderRouter(providers(), hedge=False, max_workers=workers)),
+                ('two, hedged', ProviderRouter(providers(), hedge=True, max_workers=workers)),
+            ]
+            self.stdout.write(
+                f"{options['requests']} requests, concurrency {options['concurrency']}, "
+                f"{options['stall_rate']:.0%} of calls stall {options['stall_seconds']}s"
+            )
+            self.stdout.write(
+                f"{'scenario':<18}" + ''.join(f"{c:>10}" for c in ('p50 ms', 'p90 ms', 'p99 ms', 'max ms'))
+                + f"{'hedged':>9}"
+            )
+            for name, router in scenarios:
+                stats = self.run(router, options)
+                self.stdout.write(
+                    f"{name:<18}"
+                    + ''.join(f"{stats[c] * 1000:>10.0f}" for c in ('p50', 'p90', 'p99', 'max'))
+                    + f"{stats['hedged']:>9.1%}"
+                )
@@ -0,0 +1,85 @@
+"""
+Measure cold start to first 200 with and without worker warm-up.
+
+Usage:
+    python manage.py benchmark_startup
+    python manage.py benchmark_startup --runs 10 --path /api/tickets/stats/
+
+Each run starts a fresh Python process, loads the WSGI application the
+way a gunicorn worker does and times the first request. In the ``warm``
+mode the process runs the same hooks as gunicorn.conf.py (warm-up in
+TicketsConfig.ready() plus ``warm_up_worker``) before the request is sent.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+CHILD = r"""
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+if sys.argv[1] == 'warm':
+    from tickets.warmup import warm_up_worker
+    warm_up_worker()
+booted = time.perf_counter()
+
+environ = {'PATH_INFO': sys.argv[2], 'REQUEST_METHOD': 'GET', 'HTTP_HOST': 'localhost'}
+setup_testing_defaults(environ)
+statuses = []
+body = application(environ, lambda status, headers: statuses.append(status))
+b''.join(body)
+first = time.perf_counter()
+
+environ = {'PATH_INFO': sys.argv[2], 'REQUEST_METHOD': 'GET', 'HTTP_HOST': 'localhost'}
+setup_testing_defaults(environ)
+b''.join(application(environ, lambda status, headers: None))
+second = time.perf_counter()
+
+print(json.dumps({
+    'status': statuses[0],
+    'boot_ms': (booted - started) * 1000,
+    'first_request_ms': (first - booted) * 1000,
+    'total_ms': (first - started) * 1000,
+    'second_request_ms': (second - first) * 1000,
+}))
+"""
+
+METRICS = ('boot_ms', 'first_request_ms', 'total_ms', 'second_request_ms')
+
+
+class Command(BaseCommand):
+    help = "Compare cold-start-to-first-200 latency with and without warm-up."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--path', default='/api/tickets/')
+
+    def run_child(self, mode, path):
+        env = {**os.environ, 'DJANGO_WARM_UP': 'True' if mode == 'warm' else 'False'}
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD, mode, path],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'mode':<6} {'status':<8}" + ''.join(f"{m:>20}" for m in METRICS))
+        for mode in ('lazy', 'warm'):
+            runs = [self.run_child(mode, options['path']) for _ in range(options['runs'])]
+            medians = {m: statistics.median(r[m] for r in runs) for m in METRICS}
+            self.stdout.write(
+                f"{mode:<6} {runs[0]['status'][:3]:<8}"
+                + ''.join(f"{medians[m]:>20.1f}" for m in METRICS)
+            )
+        self.stdout.write(
+            "boot_ms is paid once in the master with --preload; "
+            "first_request_ms is what the first client of each worker sees."
+        )
@@ -0,0 +1,37 @@
+"""
+Prepare the database for the backend container in a single process.
+
+Usage:
+    python manage.py bootstrap
+
+Migrates every shard that has pending migrations (see ``setup_shards``),
+creates the shared cache table if it is missing and creates the admin
+superuser if it does not exist yet. Credentials come from
+DJANGO_SUPERUSER_USERNAME / _EMAIL / _PASSWORD.
+"""
+
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Migrate all shards, create the cache table and ensure the admin superuser exists."
+
+    def handle(self, *args, **options):
+        call_command('setup_shards', verbosity=options['verbosity'])
+        call_command('createcachetable', verbosity=options['verbosity'])
+
+        username = os.environ.get('DJANGO_SUPERUSER_USERNAME', 'admin')
+        User = get_user_model()
+        if User.objects.filter(username=username).exists():
+            self.stdout.write('Superuser already exists')
+            return
+        User.objects.create_superuser(
+            username,
+            os.environ.get('DJANGO_SUPERUSER_EMAIL', 'admin@example.com'),
+            os.environ.get('DJANGO_SUPERUSER_PASSWORD', 'admin123'),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Superuser created: {username}"))
@@ -0,0 +1,42 @@
+"""
+Create an API token that authenticates requests as one organization.
+
+Usage:
+    python manage.py create_org_token acme --name billing-sync
+
+The token is printed once; only its SHA-256 digest is stored. Clients send
+it as ``Authorization: Bearer <token>``. Tokens are for server-to-server
+clients only: never build one into the browser app, where every visitor
+can read it. Revoke a token by deleting it in Django Admin
+(Organizations > tokens).
+"""
+
+import secrets
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.models import Organization, OrganizationToken
+
+
+class Command(BaseCommand):
+    help = "Create an API token for an organization and print it."
+
+    def add_arguments(self, parser):
+        parser.add_argument('organization', help="Organization slug")
+        parser.add_argument('--name', default='api', help="What the token is used by")
+
+    def handle(self, *args, **options):
+        organization = Organization.objects.filter(slug=options['organization']).first()
+        if organization is None:
+            raise CommandError(f"Unknown organization: {options['organization']}")
+
+        token = secrets.token_urlsafe(32)
+        OrganizationToken.objects.create(
+            organization=organization,
+            name=options['name'],
+            digest=OrganizationToken.digest_for(token),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Token {options['name']!r} for {organization.slug} (shown once):"
+        ))
+        self.stdout.write(token)
@@ -0,0 +1,68 @@
+"""
+Escalate open tickets that have waited past their age threshold.
+
+Usage:
+    python manage.py escalate_tickets            # long-running worker
+    python manage.py escalate_tickets --once     # single pass, e.g. from cron
+
+The worker sleeps until the earliest escalation deadline or the next heap
+rebuild, whichever comes first (see ``tickets.escalation``).
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tickets.escalation import EscalationPolicy, EscalationScheduler
+
+MIN_SLEEP_SECONDS = 0.5
+
+
+class Command(BaseCommand):
+    help = "Bump the priority of open tickets that exceed ESCALATION_THRESHOLDS_MINUTES."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run one pass and exit")
+        parser.add_argument(
+            '--rebuild-interval', type=int, default=settings.ESCALATION_REBUILD_SECONDS,
+            help="Seconds between deadline heap rebuilds (upper bound on escalation delay)"
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        policy = EscalationPolicy()
+        if policy.shortest() is None:
+            self.stdout.write("No escalation thresholds configured")
+            return
+
+        scheduler = EscalationScheduler(
+            ['default', *settings.TENANT_SHARDS], policy, batch_size=options['batch_size']
+        )
+        rebuild_interval = timedelta(seconds=options['rebuild_interval'])
+        if rebuild_interval > policy.shortest():
+            self.stderr.write(self.style.WARNING(
+                "Rebuild interval exceeds the shortest threshold; new tickets may escalate late"
+            ))
+
+        next_rebuild = timezone.now()
+        try:
+            while True:
+                now = timezone.now()
+                if now >= next_rebuild:
+                    scheduled = scheduler.rebuild()
+                    next_rebuild = now + rebuild_interval
+                    self.stdout.write(f"Scheduled {scheduled} open tickets")
+
+                escalated = scheduler.run_due(now)
+                if escalated:
+                    self.stdout.write(f"Escalated {escalated} tickets")
+                if options['once']:
+                    return
+
+                wake_at = min(filter(None, (scheduler.next_deadline(), next_rebuild)))
+                time.sleep(max((wake_at - timezone.now()).total_seconds(), MIN_SLEEP_SECONDS))
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping escalation worker")
@@ -0,0 +1,62 @@
+"""
+Export tickets to CSV, Parquet or Arrow without loading them into memory.
+
+Usage:
+    python manage.py export_tickets --format parquet --output tickets.parquet
+    python manage.py export_tickets --format csv --status open > open.csv
+    python manage.py export_tickets --organization acme --format arrow --output acme.arrow
+"""
+
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.exporters import EXPORT_FORMATS, iter_batches, pyarrow_available
+from tickets.filters import apply_ticket_filters
+from tickets.tenancy import get_organization, tenant_context, tenant_tickets
+
+
+class Command(BaseCommand):
+    help = "Stream tickets matching the list filters to a CSV, Parquet or Arrow file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', default='-', help="File path, or '-' for stdout")
+        parser.add_argument('--batch-size', type=int, default=settings.EXPORT_BATCH_SIZE)
+        parser.add_argument('--category')
+        parser.add_argument('--priority')
+        parser.add_argument('--status')
+        parser.add_argument('--search')
+        parser.add_argument(
+            '--organization', default=settings.DEFAULT_ORGANIZATION,
+            help="Slug of the organization to export"
+        )
+
+    def handle(self, *args, **options):
+        export_format = options['format']
+        if export_format != 'csv' and not pyarrow_available():
+            raise CommandError(f"{export_format} export requires pyarrow to be installed")
+
+        organization = get_organization(options['organization'])
+        if organization is None:
+            raise CommandError(f"Unknown organization: {options['organization']}")
+
+        encoder = EXPORT_FORMATS[export_format][0]
+        with tenant_context(organization):
+            queryset = apply_ticket_filters(tenant_tickets(), options)
+        chunks = encoder(iter_batches(queryset, options['batch_size']))
+
+        if options['output'] == '-':
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+            return
+
+        written = 0
+        with open(options['output'], 'wb') as out:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}"))
@@ -0,0 +1,196 @@
+"""
+Move one organization's data to another shard with a short write freeze.
+
+Usage:
+    python manage.py move_tenant acme shard2
+    python manage.py move_tenant acme shard2 --keep-source
+
+Steps:
+    1. Copy every tenant row to the target in primary-key batches while
+       the tenant stays fully writable.
+    2. Mark the organization read-only and wait for every worker's cached
+       copy to expire (writes now get 503 + Retry-After).
+    3. Copy rows written during step 1 and drop rows deleted meanwhile.
+    4. Point the organization at the target shard and re-enable writes.
+    5. Wait out the cache again, then delete the source rows.
+
+Ids are preserved; ``setup_shards`` gives each shard its own id range so
+they never collide with rows created on the target. Classification usage
+rows are per-shard telemetry without a tenant and are not moved.
+"""
+
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from tickets.models import IdempotencyRecord, Organization, Ticket, TicketEvent, TicketMetricDigest
+from tickets.tenancy import forget_organization
+
+DRAIN_GRACE_SECONDS = 2
+
+
+def tenant_querysets(organization, alias):
+    """(model, queryset) pairs holding ``organization``'s rows on ``alias``, parents first."""
+    return [
+        (Ticket, Ticket.objects.using(alias).filter(organization=organization)),
+        (TicketEvent, TicketEvent.objects.using(alias).filter(ticket__organization=organization)),
+        (TicketMetricDigest, TicketMetricDigest.objects.using(alias).filter(organization=organization)),
+        (IdempotencyRecord, IdempotencyRecord.objects.using(alias).filter(
+            scope__endswith=f":{organization.id}"
+        )),
+    ]
+
+
+@contextmanager
+def preserved_timestamps(model):
+    """Stop auto_now / auto_now_add fields from overwriting copied timestamps."""
+    saved = []
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            saved.append((field, field.auto_now, field.auto_now_add))
+            field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def copy_rows(model, queryset, target, batch_size, owned):
+    """
+    Upsert ``queryset`` into ``target`` in primary-key order; returns rows copied.
+
+    ``owned`` is the tenant's queryset on ``target``; an id already used
+    there by another tenant aborts the copy instead of overwriting it.
+    """
+    update_fields = [f.name for f in model._meta.concrete_fields if not f.primary_key]
+    copied = 0
+    last_pk = 0
+    with preserved_timestamps(model):
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+            if not batch:
+                return copied
+            pks = [row.pk for row in batch]
+            clash = model.objects.using(target).filter(pk__in=pks).exclude(
+                pk__in=owned.filter(pk__in=pks).values('pk')
+            ).first()
+            if clash is not None:
+                raise CommandError(
+                    f"{model._meta.verbose_name} id {clash.pk} is already used on {target}; "
+                    f"run setup_shards to give each shard its own id range"
+                )
+            model.objects.using(target).bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=update_fields,
+            )
+            copied += len(batch)
+            last_pk = batch[-1].pk
+
+
+class Command(BaseCommand):
+    help = "Move an organization's tickets, events, digests and idempotency keys to another shard."
+
+    def add_arguments(self, parser):
+        parser.add_argument('organization', help="Organization slug")
+        parser.add_argument('target', help="Target database alias (one of TENANT_SHARDS)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--keep-source', action='store_true',
+            help="Leave the copied rows on the old shard"
+        )
+
+    def wait_for_workers(self):
+        delay = settings.ORGANIZATION_CACHE_SECONDS + DRAIN_GRACE_SECONDS
+        self.stdout.write(f"Waiting {delay}s for workers to reload the organization...")
+        time.sleep(delay)
+
+    def handle(self, *args, **options):
+        organization = Organization.objects.filter(slug=options['organization']).first()
+        if organization is None:
+            raise CommandError(f"Unknown organization: {options['organization']}")
+        source, target = organization.shard, options['target']
+        if target not in settings.TENANT_SHARDS:
+            raise CommandError(f"{target} is not listed in TENANT_SHARDS")
+        if target == source:
+            raise CommandError(f"{organization.slug} already lives on {target}")
+
+        batch_size = options['batch_size']
+        started = timezone.now()
+
+        # 1. Bulk copy while the tenant stays writable.
+        owned = dict(tenant_querysets(organization, target))
+        for model, queryset in tenant_querysets(organization, source):
+            copied = copy_rows(model, queryset, target, batch_size, owned[model])
+            self.stdout.write(f"Copied {copied} {model._meta.verbose_name_plural}")
+
+        # 2. Freeze writes.
+        Organization.objects.filter(pk=organization.pk).update(read_only=True)
+        forget_organization(organization.slug)
+        self.wait_for_workers()
+
+        try:
+            # 3. Catch up on rows written or deleted during the bulk copy.
+            with transaction.atomic(using=target):
+                tickets = Ticket.objects.using(source).filter(organization=organization)
+                changed = copy_rows(
+                    Ticket, tickets.filter(updated_at__gte=started), target, batch_size, owned[Ticket]
+                )
+                copied_ids = Ticket.objects.using(target).filter(organization=organization)
+                stale_ids = sorted(
+                    set(copied_ids.values_list('id', flat=True))
+                    - set(tickets.values_list('id', flat=True))
+                )
+                removed = 0
+                for start in range(0, len(stale_ids), batch_size):
+                    deleted, _ = copied_ids.filter(id__in=stale_ids[start:start + batch_size]).delete()
+                    removed += deleted
+
+                events = TicketEvent.objects.using(source).filter(
+                    ticket__organization=organization, created_at__gte=started
+                )
+                copy_rows(TicketEvent, events, target, batch_size, owned[TicketEvent])
+                # Digest buckets are few and mutated in place, so copy them all again.
+                copy_rows(
+                    TicketMetricDigest,
+                    TicketMetricDigest.objects.using(source).filter(organization=organization),
+                    target, batch_size, owned[TicketMetricDigest],
+                )
+                # Keys of any age change in place (a pending claim completes) or
+                # are released. Drop those gone from the source (a re-claimed key
+                # gets a new id), then copy every unexpired key again; the table
+                # only holds a TTL's worth.
+                keys = IdempotencyRecord.objects.using(source).filter(scope__endswith=f":{organization.id}")
+                released, _ = owned[IdempotencyRecord].exclude(
+                    id__in=list(keys.values_list('id', flat=True))
+                ).delete()
+                removed += released
+                copy_rows(
+                    IdempotencyRecord, keys.filter(expires_at__gt=timezone.now()),
+                    target, batch_size, owned[IdempotencyRecord],
+                )
+            self.stdout.write(f"Caught up {changed} changed tickets, removed {removed} deleted rows")
+
+            # 4. Flip the shard and thaw.
+            Organization.objects.filter(pk=organization.pk).update(shard=target, read_only=False)
+        except Exception:
+            Organization.objects.filter(pk=organization.pk).update(read_only=False)
+            forget_organization(organization.slug)
+            raise
+        forget_organization(organization.slug)
+        self.stdout.write(self.style.SUCCESS(f"{organization.slug} now lives on {target}"))
+
+        # 5. Drop the source copy once no worker can still be reading it.
+        if options['keep_source']:
+            return
+        self.wait_for_workers()
+        with transaction.atomic(using=source):
+            for model, queryset in reversed(tenant_querysets(organization, source)):
+                deleted, _ = queryset.delete()
+                self.stdout.write(f"Deleted {deleted} rows ({model._meta.verbose_name_plural}) from {source}")
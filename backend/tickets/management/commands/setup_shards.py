@@ -0,0 +1,73 @@
+"""
+Migrate every tenant shard and give each its own primary-key range.
+
+Usage:
+    python manage.py setup_shards
+
+Runs ``migrate`` on each alias in TENANT_SHARDS (the directory database
+first), skipping aliases that are already up to date. On PostgreSQL the
+id sequences of tenant tables on the N-th shard are raised to start at
+N * SHARD_ID_SPACING, so rows copied between shards by ``move_tenant``
+keep their ids without colliding.
+"""
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+from tickets.routers import DIRECTORY_MODELS
+
+SHARD_ID_SPACING = 10 ** 12
+
+
+def has_pending_migrations(alias) -> bool:
+    executor = MigrationExecutor(connections[alias])
+    return bool(executor.migration_plan(executor.loader.graph.leaf_nodes()))
+
+
+def tenant_models():
+    """Models in the tickets app whose rows live on tenant shards."""
+    return [
+        model for model in apps.get_app_config('tickets').get_models()
+        if model._meta.model_name not in DIRECTORY_MODELS
+    ]
+
+
+class Command(BaseCommand):
+    help = "Run migrations on every tenant shard and assign per-shard id ranges."
+
+    def handle(self, *args, **options):
+        aliases = [DEFAULT_DB_ALIAS] + [a for a in settings.TENANT_SHARDS if a != DEFAULT_DB_ALIAS]
+        for alias in aliases:
+            if not has_pending_migrations(alias):
+                # Skips migrate's post-migrate permission and content type sync.
+                self.stdout.write(f"==> {alias} is up to date")
+                continue
+            self.stdout.write(f"==> Migrating {alias}")
+            call_command('migrate', database=alias, interactive=False, verbosity=options['verbosity'])
+
+        for index, alias in enumerate(settings.TENANT_SHARDS):
+            if index == 0:
+                continue
+            connection = connections[alias]
+            if connection.vendor != 'postgresql':
+                self.stdout.write(f"Skipping id ranges on {alias} ({connection.vendor})")
+                continue
+            floor = index * SHARD_ID_SPACING
+            with connection.cursor() as cursor:
+                for model in tenant_models():
+                    table = model._meta.db_table
+                    column = model._meta.pk.column
+                    # Only ever moves a sequence forward.
+                    cursor.execute(
+                        f"SELECT setval(pg_get_serial_sequence(%s, %s), "
+                        f"GREATEST(%s, (SELECT COALESCE(MAX({connection.ops.quote_name(column)}), 0) "
+                        f"FROM {connection.ops.quote_name(table)})))",
+                        [table, column, floor],
+                    )
+            self.stdout.write(f"{alias}: ids start at {floor}")
+
+        self.stdout.write(self.style.SUCCESS(f"Set up {len(aliases)} database(s)"))
@@ -0,0 +1,56 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketMetricDigest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('first_response', 'Time to first response'), ('resolution', 'Time to resolution')], max_length=20)),
+                ('category', models.CharField(choices=[('billing', 'Billing'), ('technical', 'Technical'), ('account', 'Account'), ('general', 'General')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('critical', 'Critical')], max_length=20)),
+                ('day', models.DateField(help_text='Day the measured transition happened')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total_seconds', models.FloatField(default=0.0)),
+                ('digest', models.JSONField(default=dict, help_text='Serialized t-digest of durations in seconds')),
+            ],
+            options={
+                'verbose_name': 'Ticket Metric Digest',
+                'verbose_name_plural': 'Ticket Metric Digests',
+                'db_table': 'ticket_metric_digests',
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('status', 'Status'), ('priority', 'Priority'), ('category', 'Category')], help_text='Which ticket field changed', max_length=20)),
+                ('old_value', models.CharField(help_text='Value before the change', max_length=20)),
+                ('new_value', models.CharField(help_text='Value after the change', max_length=20)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, help_text='Timestamp of the change')),
+                ('ticket', models.ForeignKey(help_text='Ticket that changed', on_delete=django.db.models.deletion.CASCADE, related_name='events', to='tickets.ticket')),
+            ],
+            options={
+                'verbose_name': 'Ticket Event',
+                'verbose_name_plural': 'Ticket Events',
+                'db_table': 'ticket_events',
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ticketmetricdigest',
+            constraint=models.UniqueConstraint(fields=('metric', 'day', 'category', 'priority'), name='tix_metric_bucket_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketevent',
+            index=models.Index(fields=['ticket', 'field', 'created_at'], name='tix_event_ticket_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0003_open_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassificationCall',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(help_text='Provider that answered', max_length=50)),
+                ('estimated_prompt_tokens', models.PositiveIntegerField(help_text='Local estimate at build time')),
+                ('prompt_tokens', models.PositiveIntegerField(blank=True, help_text='Provider-reported prompt tokens', null=True)),
+                ('cached_tokens', models.PositiveIntegerField(blank=True, help_text='Prompt tokens served from provider cache', null=True)),
+                ('completion_tokens', models.PositiveIntegerField(blank=True, help_text='Provider-reported completion tokens', null=True)),
+                ('latency_ms', models.PositiveIntegerField(help_text='Wall-clock latency of the winning call')),
+                ('hedged', models.BooleanField(default=False, help_text='Whether a hedge request was fired')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Classification Call',
+                'verbose_name_plural': 'Classification Calls',
+                'db_table': 'classification_calls',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,128 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+PRIORITY_RANK = models.Case(
+    models.When(priority='critical', then=models.Value(0)),
+    models.When(priority='high', then=models.Value(1)),
+    models.When(priority='medium', then=models.Value(2)),
+    models.When(priority='low', then=models.Value(3)),
+    default=models.Value(4),
+    output_field=models.SmallIntegerField(),
+)
+
+
+def assign_default_organization(apps, schema_editor):
+    """Create the default tenant and give it every pre-existing row."""
+    db = schema_editor.connection.alias
+    Organization = apps.get_model('tickets', 'Organization')
+    Ticket = apps.get_model('tickets', 'Ticket')
+    TicketMetricDigest = apps.get_model('tickets', 'TicketMetricDigest')
+
+    if db != 'default' and not (
+        Ticket.objects.using(db).exists() or TicketMetricDigest.objects.using(db).exists()
+    ):
+        return
+
+    organization, _ = Organization.objects.using('default').get_or_create(
+        slug=settings.DEFAULT_ORGANIZATION,
+        defaults={'name': 'Default', 'shard': 'default'},
+    )
+    Ticket.objects.using(db).update(organization_id=organization.id)
+    TicketMetricDigest.objects.using(db).update(organization_id=organization.id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0005_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Organization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('slug', models.SlugField(help_text='Value of the X-Organization header', max_length=100, unique=True)),
+                ('shard', models.CharField(help_text="Database alias holding this tenant's data; chosen by hash on creation", max_length=50)),
+                ('read_only', models.BooleanField(default=False, help_text='Rejects writes while the tenant is being moved between shards')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Organization',
+                'verbose_name_plural': 'Organizations',
+                'db_table': 'organizations',
+                'ordering': ['slug'],
+            },
+        ),
+        migrations.RemoveConstraint(
+            model_name='ticketmetricdigest',
+            name='tix_metric_bucket_unique',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='tix_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='tix_cat_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='tix_pri_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='tix_open_queue_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='tix_open_cat_queue_idx',
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='organization',
+            field=models.ForeignKey(db_constraint=False, null=True, help_text='Owning organization (tenant)', on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tickets.organization'),
+        ),
+        migrations.AddField(
+            model_name='ticketmetricdigest',
+            name='organization',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tickets.organization'),
+        ),
+        migrations.RunPython(assign_default_organization, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='ticket',
+            name='organization',
+            field=models.ForeignKey(db_constraint=False, help_text='Owning organization (tenant)', on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tickets.organization'),
+        ),
+        migrations.AlterField(
+            model_name='ticketmetricdigest',
+            name='organization',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tickets.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['organization', '-created_at'], name='tix_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['organization', 'category', 'status'], name='tix_cat_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['organization', 'priority', 'status'], name='tix_pri_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(models.F('organization'), PRIORITY_RANK, models.F('created_at'), condition=models.Q(('status', 'open')), name='tix_open_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(models.F('organization'), models.F('category'), PRIORITY_RANK, models.F('created_at'), condition=models.Q(('status', 'open')), name='tix_open_cat_queue_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ticketmetricdigest',
+            constraint=models.UniqueConstraint(fields=('organization', 'metric', 'day', 'category', 'priority'), name='tix_metric_bucket_unique'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-19 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_organizations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='escalated_at',
+            field=models.DateTimeField(blank=True, help_text='When the escalation scanner last bumped or re-flagged this ticket', null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='escalation_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of automatic escalations'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('status', 'open')), fields=['created_at'], include=('id', 'category', 'priority', 'escalated_at'), name='tix_open_escalation_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_ticket_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='members',
+            field=models.ManyToManyField(blank=True, help_text='Logged-in users allowed to act as this organization; superusers may act as any', related_name='organizations', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='OrganizationToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='What the token is used by, e.g. "frontend"', max_length=100)),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='tickets.organization')),
+            ],
+            options={
+                'verbose_name': 'Organization Token',
+                'verbose_name_plural': 'Organization Tokens',
+                'db_table': 'organization_tokens',
+                'ordering': ['organization', 'name'],
+            },
+        ),
+    ]
@@ -1,5 +1,98 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
-from django.db.models import Q
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+
+# Dispatch order for the agent work queue: lower rank is served first.
+PRIORITY_RANK = Case(
+    When(priority='critical', then=Value(0)),
+    When(priority='high', then=Value(1)),
+    When(priority='medium', then=Value(2)),
+    When(priority='low', then=Value(3)),
+    default=Value(4),
+    output_field=models.SmallIntegerField(),
+)
+
+# Full-text document for admin search; queries must use this exact
+# expression so PostgreSQL can match it to tix_search_idx.
+SEARCH_CONFIG = 'english'
+SEARCH_VECTOR = SearchVector('title', 'description', config=SEARCH_CONFIG)
+
+
+class Organization(models.Model):
+    """
+    Customer organization (tenant).
+
+    Lives in the ``default`` (directory) database. Every tenant-owned row
+    carries ``organization_id`` and is stored on the tenant's ``shard``.
+    """
+
+    name = models.CharField(max_length=200)
+    slug = models.SlugField(max_length=100, unique=True, help_text='Value of the X-Organization header')
+    shard = models.CharField(
+        max_length=50,
+        help_text='Database alias holding this tenant\'s data; chosen by hash on creation'
+    )
+    read_only = models.BooleanField(
+        default=False,
+        help_text='Rejects writes while the tenant is being moved between shards'
+    )
+    members = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        related_name='organizations',
+        help_text='Logged-in users allowed to act as this organization; superusers may act as any'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['slug']
+        db_table = 'organizations'
+        verbose_name = 'Organization'
+        verbose_name_plural = 'Organizations'
+
+    def __str__(self):
+        return self.slug
+
+    def save(self, *args, **kwargs):
+        """Pin new tenants to their hash-placed shard so adding shards later never moves them."""
+        if not self.shard:
+            from .tenancy import shard_for_slug
+            self.shard = shard_for_slug(self.slug)
+        super().save(*args, **kwargs)
+
+
+class OrganizationToken(models.Model):
+    """
+    API token that authenticates requests as one organization.
+
+    Only the SHA-256 digest is stored; ``create_org_token`` prints the
+    token once. Lives in the ``default`` (directory) database.
+    """
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='tokens')
+    name = models.CharField(max_length=100, help_text='What the token is used by, e.g. "frontend"')
+    digest = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['organization', 'name']
+        db_table = 'organization_tokens'
+        verbose_name = 'Organization Token'
+        verbose_name_plural = 'Organization Tokens'
+
+    def __str__(self):
+        return f"{self.organization}:{self.name}"
+
+    @staticmethod
+    def digest_for(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
 
 
 class Ticket(models.Model):
@@ -47,6 +140,16 @@ class Ticket(models.Model):
     ]
     
     # Fields
+    # Tenant rows may live on a different database than organizations,
+    # so the relation is not enforced by a database constraint.
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+        help_text='Owning organization (tenant)'
+    )
+    
     title = models.CharField(
         max_length=200,
         blank=False,
@@ -100,12 +203,46 @@ class Ticket(models.Model):
         help_text='Timestamp when ticket was last updated'
     )
     
+    escalated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='When the escalation scanner last bumped or re-flagged this ticket'
+    )
+    
+    escalation_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of automatic escalations'
+    )
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['-created_at'], name='tix_created_idx'),
-            models.Index(fields=['category', 'status'], name='tix_cat_status_idx'),
-            models.Index(fields=['priority', 'status'], name='tix_pri_status_idx'),
+            # Every index leads with the tenant key so per-tenant queries
+            # never scan another tenant's rows.
+            models.Index(fields=['organization', '-created_at'], name='tix_created_idx'),
+            models.Index(fields=['organization', 'category', 'status'], name='tix_cat_status_idx'),
+            models.Index(fields=['organization', 'priority', 'status'], name='tix_pri_status_idx'),
+            # Partial indexes backing POST /api/tickets/next/ (global and per-category queues)
+            models.Index(
+                F('organization'), PRIORITY_RANK, F('created_at'),
+                name='tix_open_queue_idx',
+                condition=Q(status='open'),
+            ),
+            models.Index(
+                F('organization'), F('category'), PRIORITY_RANK, F('created_at'),
+                name='tix_open_cat_queue_idx',
+                condition=Q(status='open'),
+            ),
+            # Covering partial index the escalation scanner rebuilds its
+            # deadline heap from; it spans all tenants on a shard.
+            models.Index(
+                fields=['created_at'],
+                name='tix_open_escalation_idx',
+                include=['id', 'category', 'priority', 'escalated_at'],
+                condition=Q(status='open'),
+            ),
+            # Admin full-text search (PostgreSQL only, see migration 0008)
+            GinIndex(SEARCH_VECTOR, name='tix_search_idx'),
         ]
         constraints = [
             models.CheckConstraint(
@@ -155,3 +292,167 @@ class Ticket(models.Model):
         """Ensure constraints are met before saving."""
         self.full_clean()
         super().save(*args, **kwargs)
+
+
+class TicketEvent(models.Model):
+    """
+    Append-only log of changes to a ticket's status, priority or category.
+
+    Written by the PATCH endpoint; rows are never updated once created.
+    """
+
+    FIELD_STATUS = 'status'
+    FIELD_PRIORITY = 'priority'
+    FIELD_CATEGORY = 'category'
+
+    FIELD_CHOICES = [
+        (FIELD_STATUS, 'Status'),
+        (FIELD_PRIORITY, 'Priority'),
+        (FIELD_CATEGORY, 'Category'),
+    ]
+
+    ticket = models.ForeignKey(
+        Ticket,
+        on_delete=models.CASCADE,
+        related_name='events',
+        help_text='Ticket that changed'
+    )
+
+    field = models.CharField(
+        max_length=20,
+        choices=FIELD_CHOICES,
+        help_text='Which ticket field changed'
+    )
+
+    old_value = models.CharField(
+        max_length=20,
+        help_text='Value before the change'
+    )
+
+    new_value = models.CharField(
+        max_length=20,
+        help_text='Value after the change'
+    )
+
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        help_text='Timestamp of the change'
+    )
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['ticket', 'field', 'created_at'], name='tix_event_ticket_idx'),
+        ]
+        db_table = 'ticket_events'
+        verbose_name = 'Ticket Event'
+        verbose_name_plural = 'Ticket Events'
+
+    def __str__(self):
+        return f"#{self.ticket_id} {self.field}: {self.old_value} -> {self.new_value}"
+
+    def save(self, *args, **kwargs):
+        """Events are append-only."""
+        if not self._state.adding:
+            raise ValueError("Ticket events are append-only and cannot be modified")
+        super().save(*args, **kwargs)
+
+
+class TicketMetricDigest(models.Model):
+    """
+    Incrementally maintained duration aggregate for one metric bucket.
+
+    One row per (organization, metric, category, priority, day). ``digest`` holds a
+    serialized t-digest so percentiles can be merged across buckets at
+    read time without touching the event log.
+    """
+
+    METRIC_FIRST_RESPONSE = 'first_response'
+    METRIC_RESOLUTION = 'resolution'
+
+    METRIC_CHOICES = [
+        (METRIC_FIRST_RESPONSE, 'Time to first response'),
+        (METRIC_RESOLUTION, 'Time to resolution'),
+    ]
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+    )
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    category = models.CharField(max_length=20, choices=Ticket.CATEGORY_CHOICES)
+    priority = models.CharField(max_length=20, choices=Ticket.PRIORITY_CHOICES)
+    day = models.DateField(help_text='Day the measured transition happened')
+
+    count = models.PositiveIntegerField(default=0)
+    total_seconds = models.FloatField(default=0.0)
+    digest = models.JSONField(default=dict, help_text='Serialized t-digest of durations in seconds')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'metric', 'day', 'category', 'priority'],
+                name='tix_metric_bucket_unique',
+            ),
+        ]
+        db_table = 'ticket_metric_digests'
+        verbose_name = 'Ticket Metric Digest'
+        verbose_name_plural = 'Ticket Metric Digests'
+
+    def __str__(self):
+        return f"{self.metric} {self.day} {self.category}/{self.priority} (n={self.count})"
+
+
+class ClassificationCall(models.Model):
+    """
+    Token usage and latency of one LLM classification call.
+    """
+
+    provider = models.CharField(max_length=50, help_text='Provider that answered')
+    estimated_prompt_tokens = models.PositiveIntegerField(help_text='Local estimate at build time')
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True, help_text='Provider-reported prompt tokens')
+    cached_tokens = models.PositiveIntegerField(null=True, blank=True, help_text='Prompt tokens served from provider cache')
+    completion_tokens = models.PositiveIntegerField(null=True, blank=True, help_text='Provider-reported completion tokens')
+    latency_ms = models.PositiveIntegerField(help_text='Wall-clock latency of the winning call')
+    hedged = models.BooleanField(default=False, help_text='Whether a hedge request was fired')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        db_table = 'classification_calls'
+        verbose_name = 'Classification Call'
+        verbose_name_plural = 'Classification Calls'
+
+    def __str__(self):
+        return f"{self.provider}: {self.prompt_tokens or self.estimated_prompt_tokens}+{self.completion_tokens} tokens, {self.latency_ms}ms"
+
+
+class IdempotencyRecord(models.Model):
+    """
+    Cached response for a request sent with an ``Idempotency-Key`` header.
+
+    Retries with the same key and body replay ``response_body`` instead
+    of re-running the endpoint. Rows expire after IDEMPOTENCY_KEY_TTL.
+    """
+
+    scope = models.CharField(max_length=50, help_text='Endpoint the key was used on')
+    key = models.CharField(max_length=255, help_text='Client-supplied Idempotency-Key')
+    fingerprint = models.CharField(max_length=64, help_text='SHA-256 of the request payload')
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='idem_scope_key_unique'),
+        ]
+        db_table = 'idempotency_keys'
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+
+    def __str__(self):
+        return f"{self.scope}:{self.key}"
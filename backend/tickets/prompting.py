@@ -0,0 +1,364 @@
+"""
+Prompt construction and token budgeting for ticket classification.
+
+Messages are laid out so the system prompt is a byte-stable prefix shared
+by every call, which lets provider-side and local-server prompt caches
+reuse it. Variable parts follow it: few-shot examples picked by relevance
+from stored tickets, then the ticket description trimmed to a token budget.
+
+OpenAI only caches prompts whose identical prefix is at least
+PROVIDER_CACHE_MIN_TOKENS long, which the rubric alone is not. Providers
+whose kind is listed in LLM_PROMPT_CACHE_PREFIX_KINDS (none by default)
+get CACHED_SYSTEM_PROMPT instead: the rubric plus a fixed set of
+reference examples sized to clear that threshold. Cached tokens are still
+billed, only at a discount, and cache hits are best-effort, so padding
+only pays off with steady traffic; measure it with
+``benchmark_prompts --live`` before turning it on.
+"""
+
+import math
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+# Keep this string free of any per-call data; changing a single byte
+# invalidates cached prefixes on the provider side.
+SYSTEM_PROMPT = (
+    'Classify the support ticket. Reply with JSON only: {"category":"...","priority":"..."}\n'
+    'Categories:\n'
+    '- billing: payments, invoices, subscriptions, refunds, pricing\n'
+    '- technical: bugs, errors, outages, slowness, integrations\n'
+    '- account: login, passwords, access, account settings, profile\n'
+    '- general: questions, feature requests, feedback, anything else\n'
+    'Priorities:\n'
+    '- critical: system down, security breach, data loss, revenue impact\n'
+    '- high: major functionality broken, many users or business affected\n'
+    '- medium: moderate impact, workaround available\n'
+    '- low: minor or cosmetic issues, questions, feature requests'
+)
+
+# OpenAI's automatic prompt caching only applies from this many prefix tokens.
+PROVIDER_CACHE_MIN_TOKENS = 1024
+
+# Static block appended to the rubric for LLM_PROMPT_CACHE_PREFIX_KINDS:
+# two examples for each category and priority, about 1,200 tokens (local
+# estimate). None repeat DEFAULT_EXAMPLES, which may follow as few-shot
+# messages. Like SYSTEM_PROMPT it must not change between calls.
+REFERENCE_EXAMPLES = [
+    ("Every customer who checked out in the last hour was charged three times and they are "
+     "filing chargebacks with their banks", 'billing', 'critical'),
+    ("Someone changed the bank account on our billing profile and this month's payout went to "
+     "an account we do not own", 'billing', 'critical'),
+    ("Our card was declined at renewal and the whole team lost access to paid features",
+     'billing', 'high'),
+    ("Our invoice shows 500 seats but we only have 50 users, and the payment is due on Friday",
+     'billing', 'high'),
+    ("The VAT number is missing from last month's invoice and our accountant needs a corrected copy",
+     'billing', 'medium'),
+    ("I downgraded to the Basic plan two weeks ago but I am still being billed for Pro",
+     'billing', 'medium'),
+    ("Can I switch from monthly to annual billing at the end of the current period?",
+     'billing', 'low'),
+    ("Do you offer discounts for non-profit organizations or schools?", 'billing', 'low'),
+    ("The production API has returned 502 errors for every request since 09:00 and none of our "
+     "customers can check out", 'technical', 'critical'),
+    ("Our data export contains customer records that belong to another company, this looks "
+     "like a data leak", 'technical', 'critical'),
+    ("File uploads fail with a server error for everyone on our team since this morning",
+     'technical', 'high'),
+    ("The Android app crashes on launch for all users after the latest update",
+     'technical', 'high'),
+    ("Search results take about twenty seconds to appear in our larger projects",
+     'technical', 'medium'),
+    ("Webhook deliveries are delayed by about ten minutes but eventually arrive",
+     'technical', 'medium'),
+    ("The export button overlaps the search box on small screens", 'technical', 'low'),
+    ("There is a typo in the error message shown on the notification settings page",
+     'technical', 'low'),
+    ("Someone took over our admin account, changed the password and is deleting our users",
+     'account', 'critical'),
+    ("All of our employees are locked out because single sign-on rejects every login attempt",
+     'account', 'critical'),
+    ("None of our new hires receive the invitation email, so they cannot join the workspace",
+     'account', 'high'),
+    ("Our only administrator left the company and nobody can manage user permissions anymore",
+     'account', 'high'),
+    ("Two-factor codes from my authenticator app are rejected about half of the time",
+     'account', 'medium'),
+    ("I need to transfer ownership of our workspace to a colleague before I go on leave",
+     'account', 'medium'),
+    ("How do I change the email address on my profile?", 'account', 'low'),
+    ("Please update the company name shown on our account page", 'account', 'low'),
+    ("A regulator requires your security and data processing documentation from us by the end "
+     "of today", 'general', 'critical'),
+    ("Legal must have your signed data processing agreement before tomorrow's board meeting or "
+     "the company-wide rollout is cancelled", 'general', 'critical'),
+    ("We are migrating 2,000 users next week and need answers about data residency before we "
+     "can sign the contract", 'general', 'high'),
+    ("Our renewal is due in three days and we still have not received the quote we asked for",
+     'general', 'high'),
+    ("Is there an API endpoint for updating many tickets at once?", 'general', 'medium'),
+    ("Could you add a dark mode? Our agents work night shifts and the screen is very bright",
+     'general', 'medium'),
+    ("Where can I find your product roadmap?", 'general', 'low'),
+    ("Thanks, the new reporting page is great and saves us a lot of time", 'general', 'low'),
+]
+
+# Used when there are not enough stored tickets to pick examples from.
+DEFAULT_EXAMPLES = [
+    ("I can't log into my account, tried resetting password but didn't receive email",
+     'account', 'high'),
+    ("The dashboard is loading very slowly, takes 30+ seconds", 'technical', 'medium'),
+    ("I was charged twice for my subscription this month", 'billing', 'high'),
+    ("How do I export my data?", 'general', 'low'),
+]
+
+# Words that carry classification signal; sentences containing them are
+# kept first when a description has to be shortened.
+SIGNAL_WORDS = frozenset("""
+    charge charged invoice refund payment billing subscription price card
+    error bug crash down outage fail failed failing broken slow timeout
+    login password locked access account reset email security breach hack
+    data lost loss urgent critical production customers all everyone
+""".split())
+
+STOPWORDS = frozenset("""
+    a an and are as at be been but by can do does for from has have how i
+    if in into is it its me my no not of on or our so that the their them
+    then there this to was we were what when which will with you your
+""".split())
+
+def _format_answer(category: str, priority: str) -> str:
+    return f'{{"category":"{category}","priority":"{priority}"}}'
+
+
+CACHED_SYSTEM_PROMPT = SYSTEM_PROMPT + '\nReference examples:\n' + '\n'.join(
+    f"{text} => {_format_answer(category, priority)}"
+    for text, category, priority in REFERENCE_EXAMPLES
+)
+
+_TOKEN_PIECE_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+ELLIPSIS = '[...]'
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap local estimate of BPE token count.
+
+    Short words and single symbols are about one token each; longer words
+    split roughly every six characters. Good enough for budgeting; the
+    provider-reported usage recorded per call is the authoritative count.
+    """
+    count = 0
+    for piece in _TOKEN_PIECE_RE.findall(text):
+        count += max(1, math.ceil(len(piece) / 6)) if piece[0].isalnum() else 1
+    return count
+
+
+def _terms(text: str) -> frozenset:
+    return frozenset(w for w in _WORD_RE.findall(text.lower()) if w not in STOPWORDS)
+
+
+def trim_to_budget(text: str, budget: int) -> str:
+    """
+    Shorten ``text`` to roughly ``budget`` tokens.
+
+    Keeps the opening sentence, then the sentences with the most signal
+    words, in their original order, marking gaps with an ellipsis. A
+    single sentence that is still too long is cut at a word boundary.
+    """
+    text = text.strip()
+    if estimate_tokens(text) <= budget:
+        return text
+
+    sentences = [s.strip() for s in _SENTENCE_RE.split(text) if s.strip()]
+    costs = [estimate_tokens(s) for s in sentences]
+    scores = [len(_terms(s) & SIGNAL_WORDS) for s in sentences]
+
+    # Every kept sentence may be followed by a gap marker.
+    gap = estimate_tokens(ELLIPSIS)
+    chosen = {0}
+    used = costs[0] + gap
+    for index in sorted(range(1, len(sentences)), key=lambda i: (-scores[i], i)):
+        if used + costs[index] + gap > budget:
+            continue
+        chosen.add(index)
+        used += costs[index] + gap
+
+    parts = []
+    previous = -1
+    for index in sorted(chosen):
+        if parts and index != previous + 1:
+            parts.append(ELLIPSIS)
+        parts.append(sentences[index])
+        previous = index
+    if previous != len(sentences) - 1:
+        parts.append(ELLIPSIS)
+    trimmed = ' '.join(parts)
+
+    if estimate_tokens(trimmed) <= budget:
+        return trimmed
+
+    # Opening sentence alone exceeds the budget: hard cut on words.
+    words = trimmed.split()
+    kept = []
+    used = 1
+    for word in words:
+        used += estimate_tokens(word)
+        if used > budget:
+            break
+        kept.append(word)
+    return ' '.join(kept + [ELLIPSIS])
+
+
+_DEFAULT_POOL = [
+    (_terms(text), text, category, priority)
+    for text, category, priority in DEFAULT_EXAMPLES
+]
+
+
+class ExamplePool:
+    """
+    In-process cache of recent tickets used as few-shot candidates.
+
+    Reloaded from the database at most once per ``ttl`` seconds so
+    example selection costs no query on the hot path. A pool holds one
+    tenant's tickets; ``PromptBuilder`` keeps one pool per organization.
+    """
+
+    def __init__(self, size: int = 200, ttl: float = 300.0, example_budget: int = 60):
+        self.size = size
+        self.ttl = ttl
+        self.example_budget = example_budget
+        self._examples: List[Tuple[frozenset, str, str, str]] = []
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        from .tenancy import tenant_tickets
+
+        rows = tenant_tickets().only(
+            'title', 'description', 'category', 'priority'
+        ).order_by('-created_at')[:self.size]
+        self._examples = [
+            (
+                _terms(f"{row.title} {row.description}"),
+                trim_to_budget(row.description, self.example_budget),
+                row.category,
+                row.priority,
+            )
+            for row in rows
+        ]
+        self._loaded_at = time.monotonic()
+
+    def examples(self) -> List[Tuple[frozenset, str, str, str]]:
+        with self._lock:
+            if time.monotonic() - self._loaded_at > self.ttl:
+                try:
+                    self._load()
+                except Exception:
+                    # Back off for a full TTL instead of retrying every call.
+                    self._loaded_at = time.monotonic()
+                    raise
+            return self._examples
+
+    def select(self, description: str, k: int) -> List[Tuple[str, str, str]]:
+        """
+        Return up to ``k`` (description, category, priority) examples most
+        similar to ``description``, preferring distinct categories.
+        """
+        query = _terms(description)
+        scored = []
+        for terms, text, category, priority in self.examples() + _DEFAULT_POOL:
+            overlap = len(query & terms)
+            if overlap:
+                scored.append((overlap / math.sqrt(len(query) * len(terms)), text, category, priority))
+        scored.sort(key=lambda item: -item[0])
+
+        picked = []
+        seen_categories = set()
+        for _, text, category, priority in scored:
+            if category in seen_categories:
+                continue
+            picked.append((text, category, priority))
+            seen_categories.add(category)
+            if len(picked) == k:
+                break
+
+        if len(picked) < k:
+            for _, text, category, priority in _DEFAULT_POOL:
+                if category not in seen_categories:
+                    picked.append((text, category, priority))
+                    seen_categories.add(category)
+                if len(picked) == k:
+                    break
+        return picked
+
+
+class PromptBuilder:
+    """
+    Builds the chat messages for one classification call.
+    """
+
+    def __init__(self, description_budget: Optional[int] = None,
+                 few_shot: Optional[int] = None, pool: Optional[ExamplePool] = None,
+                 cache_prefix: bool = False):
+        self.description_budget = description_budget or settings.LLM_DESCRIPTION_TOKEN_BUDGET
+        self.few_shot = settings.LLM_FEW_SHOT_EXAMPLES if few_shot is None else few_shot
+        self.system_prompt = CACHED_SYSTEM_PROMPT if cache_prefix else SYSTEM_PROMPT
+        self.pool = pool
+        self._pools: Dict[Optional[int], ExamplePool] = {}
+        self._pools_lock = threading.Lock()
+
+    def _pool(self) -> ExamplePool:
+        """Example pool for the current organization; tenants never see each other's tickets."""
+        if self.pool is not None:
+            return self.pool
+        from .tenancy import current_organization_id
+
+        organization_id = current_organization_id()
+        with self._pools_lock:
+            pool = self._pools.get(organization_id)
+            if pool is None:
+                pool = self._pools[organization_id] = ExamplePool()
+            return pool
+
+    def prefix_tokens(self) -> int:
+        """Estimated tokens in the static prefix every call shares."""
+        return estimate_tokens(self.system_prompt) + 4
+
+    def warm(self) -> None:
+        """Load the current organization's example pool before the first request needs it."""
+        if self.few_shot:
+            self._pool().examples()
+
+    def build(self, description: str) -> Tuple[List[Dict[str, str]], int]:
+        """
+        Return ``(messages, estimated_prompt_tokens)`` for ``description``.
+        """
+        messages = [{"role": "system", "content": self.system_prompt}]
+
+        if self.few_shot:
+            try:
+                examples = self._pool().select(description, self.few_shot)
+            except Exception:
+                # Example lookup must never block classification.
+                examples = DEFAULT_EXAMPLES[:self.few_shot]
+            for text, category, priority in examples:
+                messages.append({"role": "user", "content": text})
+                messages.append({"role": "assistant", "content": _format_answer(category, priority)})
+
+        messages.append({
+            "role": "user",
+            "content": trim_to_budget(description, self.description_budget),
+        })
+
+        # ~4 tokens of chat framing per message
+        estimated = sum(estimate_tokens(m["content"]) + 4 for m in messages)
+        return messages, estimated
@@ -0,0 +1,42 @@
+"""
+Database router placing tenant-owned rows on the tenant's shard.
+
+Organizations, their members and API tokens always live in ``default``
+(the directory). Every other model in the tickets app is read from and
+written to the shard of the current organization; with no tenant in
+context, Django's default alias is used.
+"""
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .tenancy import get_current_organization
+
+DIRECTORY_MODELS = {'organization', 'organization_members', 'organizationtoken'}
+
+
+class TenantRouter:
+
+    def _tenant_db(self, model, **hints):
+        if model._meta.app_label != 'tickets':
+            return None
+        if model._meta.model_name in DIRECTORY_MODELS:
+            # Explicit, or Django would follow a ticket's instance hint onto its shard.
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        organization = get_current_organization()
+        return organization.shard if organization is not None else None
+
+    db_for_read = _tenant_db
+    db_for_write = _tenant_db
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Tenant rows reference organizations across databases by id only.
+        if obj1._meta.app_label == 'tickets' and obj2._meta.app_label == 'tickets':
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Every shard carries the full schema so tenants can move freely.
+        return None
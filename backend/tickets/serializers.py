@@ -18,8 +18,10 @@ class TicketSerializer(serializers.ModelSerializer):
             'status',
             'created_at',
             'updated_at',
+            'escalated_at',
+            'escalation_count',
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'escalated_at', 'escalation_count']
     
     def validate_title(self, value):
         """Ensure title is not empty and within length."""
@@ -99,6 +101,18 @@ class ClassificationRequestSerializer(serializers.Serializer):
         return value.strip()
 
 
+class NextTicketRequestSerializer(serializers.Serializer):
+    """
+    Serializer for work-queue dispatch requests.
+    """
+    category = serializers.ChoiceField(
+        choices=[choice[0] for choice in Ticket.CATEGORY_CHOICES],
+        required=False,
+        allow_blank=True,
+        help_text="Only claim tickets from this category's queue"
+    )
+
+
 class ClassificationResponseSerializer(serializers.Serializer):
     """
     Serializer for LLM classification responses.
@@ -113,6 +127,25 @@ class ClassificationResponseSerializer(serializers.Serializer):
     )
 
 
+class DurationSummarySerializer(serializers.Serializer):
+    """
+    Serializer for one merged duration bucket (seconds).
+    """
+    count = serializers.IntegerField()
+    mean_seconds = serializers.FloatField(allow_null=True)
+    p50_seconds = serializers.FloatField(allow_null=True)
+    p90_seconds = serializers.FloatField(allow_null=True)
+    p99_seconds = serializers.FloatField(allow_null=True)
+
+
+class DurationBreakdownSerializer(serializers.Serializer):
+    """
+    Serializer for a duration metric broken down by category and priority.
+    """
+    by_category = serializers.DictField(child=DurationSummarySerializer())
+    by_priority = serializers.DictField(child=DurationSummarySerializer())
+
+
 class TicketStatsSerializer(serializers.Serializer):
     """
     Serializer for aggregated ticket statistics.
@@ -128,3 +161,7 @@ class TicketStatsSerializer(serializers.Serializer):
         child=serializers.IntegerField(),
         help_text="Count of tickets by category"
     )
+    durations = serializers.DictField(
+        child=DurationBreakdownSerializer(),
+        help_text="Time to first response and resolution, by category and priority"
+    )
@@ -0,0 +1,138 @@
+"""
+Mergeable t-digest sketch for streaming percentile estimates.
+
+A t-digest summarizes a stream of numbers as a small, sorted list of
+weighted centroids. Digests built on different days can be merged without
+access to the raw observations, which lets the analytics layer keep one
+compact digest per bucket and combine buckets at read time.
+
+This is the "merging" variant (Dunning & Ertl) with the k1 scale function.
+"""
+
+import math
+from typing import Dict, List, Optional
+
+
+class TDigest:
+    """
+    Compact quantile sketch.
+
+    Centroids are stored as ``[mean, weight]`` pairs so the digest can be
+    round-tripped through a JSON column with ``to_dict`` / ``from_dict``.
+    """
+
+    DEFAULT_COMPRESSION = 100
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.centroids: List[List[float]] = []
+        self.count = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._buffer: List[List[float]] = []
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        """Add a single observation."""
+        value = float(value)
+        self._buffer.append([value, float(weight)])
+        self.count += weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self._buffer) > self.compression * 5:
+            self._compress()
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        """Fold another digest into this one and return self."""
+        if other.count == 0:
+            return self
+        other._compress()
+        self._buffer.extend([mean, weight] for mean, weight in other.centroids)
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the value at quantile ``q`` (0 <= q <= 1).
+
+        Returns None for an empty digest.
+        """
+        self._compress()
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1:
+            return self.centroids[0][0]
+
+        # Interpolate between centroid centres, anchored at min and max.
+        points = [(0.0, self.min)]
+        cumulative = 0.0
+        for mean, weight in self.centroids:
+            points.append((cumulative + weight / 2, mean))
+            cumulative += weight
+        points.append((self.count, self.max))
+
+        target = min(max(q, 0.0), 1.0) * self.count
+        for (left_pos, left_val), (right_pos, right_val) in zip(points, points[1:]):
+            if target <= right_pos:
+                span = right_pos - left_pos
+                if span <= 0:
+                    return right_val
+                return left_val + (right_val - left_val) * (target - left_pos) / span
+        return self.max
+
+    def to_dict(self) -> Dict:
+        """Serialize to a JSON-friendly dict."""
+        self._compress()
+        return {
+            'compression': self.compression,
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'centroids': self.centroids,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> 'TDigest':
+        """Rebuild a digest from ``to_dict`` output (or an empty dict)."""
+        data = data or {}
+        digest = cls(compression=data.get('compression', cls.DEFAULT_COMPRESSION))
+        digest.centroids = [list(c) for c in data.get('centroids', [])]
+        digest.count = data.get('count', 0.0)
+        digest.min = data.get('min')
+        digest.max = data.get('max')
+        return digest
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q(self, k: float) -> float:
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        merged = sorted(self.centroids + self._buffer, key=lambda c: c[0])
+        self._buffer = []
+        total = sum(weight for _, weight in merged)
+
+        compressed = []
+        current_mean, current_weight = merged[0]
+        weight_so_far = 0.0
+        q_limit = self._q(self._k(0.0) + 1)
+
+        for mean, weight in merged[1:]:
+            if (weight_so_far + current_weight + weight) / total <= q_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                compressed.append([current_mean, current_weight])
+                weight_so_far += current_weight
+                q_limit = self._q(self._k(weight_so_far / total) + 1)
+                current_mean, current_weight = mean, weight
+
+        compressed.append([current_mean, current_weight])
+        self.centroids = compressed
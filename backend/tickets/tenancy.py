@@ -0,0 +1,263 @@
+"""
+Multi-tenant support: current-organization context, shard placement and
+the request middleware that resolves the tenant.
+
+The tenant for a request is tied to who is calling:
+
+- ``Authorization: Bearer <token>`` acts as the token's organization;
+  an ``X-Organization`` header naming any other organization is refused.
+  Tokens are for server-to-server clients; the browser app logs in.
+- A logged-in user (session) acts as the organization named by the
+  header, else the one picked in the admin (stored in the session), else
+  DEFAULT_ORGANIZATION, and must be a member of it unless a superuser.
+- Anonymous requests may only use DEFAULT_ORGANIZATION, and only while
+  TENANT_ANONYMOUS_ACCESS is on.
+
+While a request is handled the organization is stored in a context
+variable; the database router and the tenant-scoped querysets read it
+from there.
+"""
+
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+from django.http import JsonResponse
+from django.urls import reverse
+
+HEADER = 'X-Organization'
+
+# Session key holding the slug picked with the admin's organization filter
+SESSION_KEY = 'organization'
+
+_current_organization = ContextVar('current_organization', default=None)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def shard_for_slug(slug: str) -> str:
+    """
+    Hash-place a new tenant on one of TENANT_SHARDS.
+
+    Uses a stable digest (not Python's salted ``hash``) so every process
+    agrees. The result is stored on the organization, so later changes to
+    TENANT_SHARDS only affect tenants created afterwards.
+    """
+    shards = settings.TENANT_SHARDS
+    digest = hashlib.sha1(slug.encode('utf-8')).digest()
+    return shards[int.from_bytes(digest[:8], 'big') % len(shards)]
+
+
+def get_current_organization():
+    """Organization for the current request or ``tenant_context`` block."""
+    return _current_organization.get()
+
+
+@contextmanager
+def tenant_context(organization):
+    """Run a block (command, job, test) as ``organization``."""
+    token = _current_organization.set(organization)
+    try:
+        yield organization
+    finally:
+        _current_organization.reset(token)
+
+
+def tenant_db() -> str:
+    """Database alias holding the current tenant's rows."""
+    organization = get_current_organization()
+    return organization.shard if organization is not None else DEFAULT_DB_ALIAS
+
+
+def tenant_tickets():
+    """
+    Ticket queryset for the current tenant, bound to its shard.
+
+    The alias is bound eagerly so lazily evaluated querysets (streamed
+    exports) still hit the right database after the request context ends.
+    """
+    from .models import Ticket
+
+    organization = get_current_organization()
+    if organization is None:
+        return Ticket.objects.all()
+    return Ticket.objects.using(organization.shard).filter(organization=organization)
+
+
+def _cache_key(slug: str) -> str:
+    return f"tenant_org:{slug}"
+
+
+def get_organization(slug: str):
+    """
+    Look up an organization by slug, cached in-process for ORGANIZATION_CACHE_SECONDS.
+
+    The short TTL bounds how long a worker keeps routing to a tenant's old
+    shard after ``move_tenant`` flips it.
+    """
+    from .models import Organization
+
+    cache = caches['local']
+    organization = cache.get(_cache_key(slug))
+    if organization is None:
+        organization = Organization.objects.using(DEFAULT_DB_ALIAS).filter(slug=slug).first()
+        if organization is None:
+            return None
+        cache.set(_cache_key(slug), organization, timeout=settings.ORGANIZATION_CACHE_SECONDS)
+    return organization
+
+
+def forget_organization(slug: str) -> None:
+    """Drop this process's cached copy of an organization."""
+    caches['local'].delete(_cache_key(slug))
+
+
+def organization_for_token(token: str):
+    """
+    Organization an API token belongs to, or None for an unknown token.
+
+    The digest-to-slug mapping is cached in-process for
+    ORGANIZATION_CACHE_SECONDS, which also bounds how long a deleted token
+    keeps working.
+    """
+    from .models import OrganizationToken
+
+    digest = OrganizationToken.digest_for(token)
+    cache = caches['local']
+    slug = cache.get(f"tenant_token:{digest}")
+    if slug is None:
+        slug = (
+            OrganizationToken.objects.using(DEFAULT_DB_ALIAS)
+            .filter(digest=digest)
+            .values_list('organization__slug', flat=True)
+            .first()
+        )
+        if slug is None:
+            return None
+        cache.set(f"tenant_token:{digest}", slug, timeout=settings.ORGANIZATION_CACHE_SECONDS)
+    return get_organization(slug)
+
+
+def is_open_organization(organization) -> bool:
+    """Whether anyone, logged in or not, may act as ``organization``."""
+    return settings.TENANT_ANONYMOUS_ACCESS and organization.slug == settings.DEFAULT_ORGANIZATION
+
+
+def can_access(user, organization) -> bool:
+    """
+    Whether a logged-in ``user`` may act as ``organization``.
+
+    Membership is cached in-process for ORGANIZATION_CACHE_SECONDS.
+    """
+    if is_open_organization(organization):
+        return True
+    if not user.is_authenticated or not user.is_active:
+        return False
+    if user.is_superuser:
+        return True
+    cache = caches['local']
+    key = f"tenant_member:{organization.id}:{user.pk}"
+    member = cache.get(key)
+    if member is None:
+        member = organization.members.filter(pk=user.pk).exists()
+        cache.set(key, member, timeout=settings.ORGANIZATION_CACHE_SECONDS)
+    return member
+
+
+def accessible_organizations(user):
+    """Organizations ``user`` may act as, for pickers such as the admin filter."""
+    from .models import Organization
+
+    organizations = Organization.objects.using(DEFAULT_DB_ALIAS)
+    if user.is_active and user.is_superuser:
+        return organizations.all()
+    allowed = Q(members__pk=user.pk) if user.is_authenticated and user.is_active else Q(pk__in=[])
+    if settings.TENANT_ANONYMOUS_ACCESS:
+        allowed |= Q(slug=settings.DEFAULT_ORGANIZATION)
+    return organizations.filter(allowed).distinct()
+
+
+def _bearer_token(request) -> Optional[str]:
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer':
+        return None
+    return token.strip()
+
+
+def _denied(detail: str, status: int) -> JsonResponse:
+    response = JsonResponse({'detail': detail}, status=status)
+    if status == 401:
+        response['WWW-Authenticate'] = 'Bearer'
+    return response
+
+
+class TenantMiddleware:
+    """
+    Resolve the tenant from the caller's API token or login for each request.
+
+    Must run after AuthenticationMiddleware. A bad token or an anonymous
+    request for a non-open organization gets 401; a token or user acting
+    as an organization it does not belong to gets 403; unknown
+    organizations get 404; writes to a tenant that is being moved between
+    shards get 503 with Retry-After.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def resolve(self, request):
+        """Return ``(organization, None)`` or ``(None, error_response)``."""
+        requested = request.headers.get(HEADER)
+        token = _bearer_token(request)
+        if token is not None:
+            organization = organization_for_token(token) if token else None
+            if organization is None:
+                return None, _denied('Invalid API token', 401)
+            if requested and requested != organization.slug:
+                return None, _denied(f"Token does not belong to organization: {requested}", 403)
+            return organization, None
+
+        user = request.user
+        if not user.is_authenticated:
+            slug = requested or settings.DEFAULT_ORGANIZATION
+            if not settings.TENANT_ANONYMOUS_ACCESS or slug != settings.DEFAULT_ORGANIZATION:
+                return None, _denied('Authentication credentials were not provided.', 401)
+        else:
+            slug = requested or request.session.get(SESSION_KEY) or settings.DEFAULT_ORGANIZATION
+
+        organization = get_organization(slug)
+        if organization is None:
+            return None, _denied(f"Unknown organization: {slug}", 404)
+        if not can_access(user, organization):
+            return None, _denied(f"Not a member of organization: {slug}", 403)
+        return organization, None
+
+    def __call__(self, request):
+        organization, denied = self.resolve(request)
+        if denied is not None:
+            if not request.path.startswith((reverse('admin:index'), reverse('rest_framework:login'))):
+                return denied
+            # Login pages must still work, and the admin lets the user pick
+            # an organization; TicketAdmin shows nothing without one.
+            return self.get_response(request)
+
+        if organization.read_only and request.method not in SAFE_METHODS:
+            response = JsonResponse(
+                {'detail': 'Organization is being migrated; writes are temporarily disabled'},
+                status=503,
+            )
+            response['Retry-After'] = str(settings.ORGANIZATION_CACHE_SECONDS)
+            return response
+
+        with tenant_context(organization):
+            return self.get_response(request)
+
+
+def current_organization_id() -> Optional[int]:
+    organization = get_current_organization()
+    return organization.id if organization is not None else None
@@ -0,0 +1,7 @@
+from django.core.cache import caches
+
+
+def clear_caches():
+    """Drop cached organizations and facet counts left over from other tests."""
+    for cache in caches.all(initialized_only=False):
+        cache.clear()
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tickets.escalation import EscalationPolicy, EscalationScheduler
+from tickets.models import Organization, Ticket, TicketEvent
+from tickets.tests import clear_caches
+
+
+class EscalationTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.organization, _ = Organization.objects.get_or_create(
+            slug='default', defaults={'name': 'Default', 'shard': 'default'}
+        )
+        self.ticket = Ticket.objects.create(
+            organization=self.organization,
+            title='Slow dashboard',
+            description='The dashboard takes a minute to load',
+            category=Ticket.CATEGORY_TECHNICAL,
+            priority=Ticket.PRIORITY_LOW,
+        )
+        Ticket.objects.filter(pk=self.ticket.pk).update(created_at=timezone.now() - timedelta(hours=2))
+
+    def medium_count(self):
+        return APIClient().get('/api/tickets/?facets=true').data['facets']['priority']['medium']
+
+    def test_due_ticket_is_bumped_and_facets_refresh(self):
+        self.assertEqual(self.medium_count(), 0)
+        scheduler = EscalationScheduler(['default'], EscalationPolicy({'low': 60}))
+        scheduler.rebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            escalated = scheduler.run_due()
+
+        self.assertEqual(escalated, 1)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.priority, Ticket.PRIORITY_MEDIUM)
+        self.assertEqual(self.ticket.escalation_count, 1)
+        event = TicketEvent.objects.get(ticket=self.ticket)
+        self.assertEqual((event.old_value, event.new_value), ('low', 'medium'))
+        self.assertEqual(self.medium_count(), 1)
+
+    def test_ticket_not_yet_due_is_left_alone(self):
+        scheduler = EscalationScheduler(['default'], EscalationPolicy({'low': 600}))
+        scheduler.rebuild()
+
+        self.assertEqual(scheduler.run_due(), 0)
+        self.assertIsNotNone(scheduler.next_deadline())
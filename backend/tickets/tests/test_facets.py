@@ -0,0 +1,67 @@
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tickets import facets
+from tickets.models import Organization, Ticket
+from tickets.tests import clear_caches
+
+
+class FacetTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.client = APIClient()
+        self.organization, _ = Organization.objects.get_or_create(
+            slug='default', defaults={'name': 'Default', 'shard': 'default'}
+        )
+
+    def create(self, **fields):
+        return Ticket.objects.create(
+            organization=self.organization,
+            title='Ticket',
+            description='Something happened',
+            **{'category': 'billing', 'priority': 'low', **fields},
+        )
+
+    def facets(self, query=''):
+        response = self.client.get(f'/api/tickets/?facets=true{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.data['facets']
+
+    def test_counts_exclude_own_filter(self):
+        self.create()
+        self.create(category='technical', priority='high')
+
+        counts = self.facets('&category=billing')
+
+        self.assertEqual(counts['category'], {'billing': 1, 'technical': 1, 'account': 0, 'general': 0})
+        self.assertEqual(counts['priority']['low'], 1)
+        self.assertEqual(counts['priority']['high'], 0)
+
+    def test_api_write_invalidates_cached_counts(self):
+        self.assertEqual(self.facets()['category']['billing'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/tickets/', {
+                'title': 'Refund', 'description': 'Please refund me', 'category': 'billing', 'priority': 'low',
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(self.facets()['category']['billing'], 1)
+
+    def test_invalidate_by_organization_outside_a_request(self):
+        # The escalation worker invalidates by id from its own process.
+        self.assertEqual(self.facets()['priority']['high'], 0)
+        ticket = self.create()
+        Ticket.objects.filter(pk=ticket.pk).update(priority='high')
+
+        self.assertEqual(self.facets()['priority']['high'], 0)
+        facets.invalidate(self.organization.id)
+        self.assertEqual(self.facets()['priority']['high'], 1)
+
+    def test_counts_live_in_the_shared_cache_table(self):
+        self.facets()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM django_cache WHERE cache_key LIKE %s", ['%ticket_facets%'])
+            self.assertGreater(cursor.fetchone()[0], 0)
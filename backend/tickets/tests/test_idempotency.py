@@ -0,0 +1,137 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection, connections
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tickets.idempotency import HEADER, REPLAY_HEADER
+from tickets.llm_service import LLMClassifier
+from tickets.models import IdempotencyRecord, Organization, Ticket
+from tickets.tests import clear_caches
+
+TICKET = {
+    'title': 'Charged twice',
+    'description': 'I was charged twice for my subscription this month',
+    'category': 'billing',
+    'priority': 'high',
+}
+CLASSIFIED = {'suggested_category': 'billing', 'suggested_priority': 'high'}
+FALLBACK = {'suggested_category': 'general', 'suggested_priority': 'medium', 'fallback': True}
+
+
+class IdempotencyTests(TransactionTestCase):
+
+    def setUp(self):
+        clear_caches()
+        Organization.objects.get_or_create(slug='default', defaults={'name': 'Default', 'shard': 'default'})
+
+    def post(self, path, data, key='key-1'):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return APIClient().post(path, data, format='json', **headers)
+
+    def classify_with(self, *results, delay=0.0):
+        calls = []
+
+        def classify(description):
+            calls.append(connection.in_atomic_block)
+            time.sleep(delay)
+            return dict(results[min(len(calls), len(results)) - 1])
+
+        patcher = mock.patch.object(LLMClassifier, 'classify_ticket', side_effect=classify)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return calls
+
+    def test_retry_replays_create(self):
+        first = self.post('/api/tickets/', TICKET)
+        second = self.post('/api/tickets/', TICKET)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second[REPLAY_HEADER], 'true')
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_key_reused_with_different_payload_is_422(self):
+        self.post('/api/tickets/', TICKET)
+        response = self.post('/api/tickets/', {**TICKET, 'priority': 'low'})
+
+        self.assertEqual(response.status_code, 422)
+
+    def test_classification_is_stored_without_holding_a_transaction(self):
+        calls = self.classify_with(CLASSIFIED)
+
+        first = self.post('/api/tickets/classify/', {'description': TICKET['description']})
+        second = self.post('/api/tickets/classify/', {'description': TICKET['description']})
+
+        self.assertEqual(first.data, CLASSIFIED)
+        self.assertEqual(second[REPLAY_HEADER], 'true')
+        self.assertEqual(calls, [False])
+
+    def test_fallback_classification_is_not_stored(self):
+        calls = self.classify_with(FALLBACK, CLASSIFIED)
+
+        first = self.post('/api/tickets/classify/', {'description': TICKET['description']})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data, {'suggested_category': 'general', 'suggested_priority': 'medium'})
+        self.assertFalse(IdempotencyRecord.objects.exists())
+
+        retry = self.post('/api/tickets/classify/', {'description': TICKET['description']})
+        self.assertEqual(retry.data, CLASSIFIED)
+        self.assertNotIn(REPLAY_HEADER, retry)
+        self.assertEqual(len(calls), 2)
+
+    def test_concurrent_duplicates_wait_and_replay(self):
+        calls = self.classify_with(CLASSIFIED, delay=0.3)
+        responses = []
+
+        def send():
+            try:
+                responses.append(self.post('/api/tickets/classify/', {'description': TICKET['description']}))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=send) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r.status_code for r in responses], [200] * 4)
+        self.assertEqual(sum(1 for r in responses if r.has_header(REPLAY_HEADER)), 3)
+
+    @override_settings(IDEMPOTENCY_WAIT_SECONDS=0.1)
+    def test_pending_key_is_409_after_wait(self):
+        self.create_pending(age=timedelta(seconds=1))
+
+        response = self.post('/api/tickets/', TICKET)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('Retry-After', response)
+        self.assertFalse(Ticket.objects.exists())
+
+    @override_settings(IDEMPOTENCY_PENDING_TIMEOUT_SECONDS=60)
+    def test_abandoned_pending_key_is_taken_over(self):
+        self.create_pending(age=timedelta(minutes=5))
+
+        response = self.post('/api/tickets/', TICKET)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(IdempotencyRecord.objects.get().status_code, 201)
+
+    def create_pending(self, age):
+        from tickets.idempotency import fingerprint
+
+        organization = Organization.objects.get(slug='default')
+        record = IdempotencyRecord.objects.create(
+            scope=f'tickets.create:{organization.id}',
+            key='key-1',
+            fingerprint=fingerprint(TICKET),
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        IdempotencyRecord.objects.filter(pk=record.pk).update(created_at=timezone.now() - age)
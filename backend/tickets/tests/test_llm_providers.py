@@ -0,0 +1,185 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from tickets.llm_providers import LatencyTracker, LocalModelProvider, ProviderError, ProviderRouter
+from tickets.llm_stubs import StubLLMServer
+
+MESSAGES = [{"role": "user", "content": "The dashboard takes 30 seconds to load."}]
+
+
+class StubServerTestCase(SimpleTestCase):
+    """Starts one stub server per name in ``stubs`` for every test."""
+
+    stubs = ('fast', 'slow')
+
+    def setUp(self):
+        self.servers = {}
+        for name in self.stubs:
+            server = StubLLMServer(latency=0.01).start()
+            self.addCleanup(server.stop)
+            self.servers[name] = server
+
+    def provider(self, name, samples=(), timeout=5.0):
+        provider = LocalModelProvider(name, 'stub', base_url=self.servers[name].base_url, timeout=timeout)
+        for seconds in samples:
+            provider.tracker.record_success(seconds)
+        return provider
+
+
+class RoutingTests(StubServerTestCase):
+
+    def test_routes_to_fastest_healthy_provider(self):
+        fast = self.provider('fast', samples=[0.01] * 10)
+        slow = self.provider('slow', samples=[0.5] * 10)
+        router = ProviderRouter([slow, fast], hedge=False)
+
+        completion = router.complete(MESSAGES)
+
+        self.assertEqual(completion.provider, 'fast')
+        self.assertEqual(self.servers['slow'].calls, 0)
+
+    def test_unmeasured_provider_is_tried_first(self):
+        fast = self.provider('fast', samples=[0.01] * 10)
+        slow = self.provider('slow')
+        router = ProviderRouter([fast, slow], hedge=False)
+
+        self.assertEqual(router.ranked(), [slow, fast])
+
+    def test_unhealthy_provider_is_skipped(self):
+        fast = self.provider('fast', samples=[0.01] * 10)
+        slow = self.provider('slow', samples=[0.5] * 10)
+        for _ in range(fast.tracker.failure_threshold):
+            fast.tracker.record_failure()
+        router = ProviderRouter([fast, slow], hedge=False)
+
+        completion = router.complete(MESSAGES)
+
+        self.assertEqual(completion.provider, 'slow')
+        self.assertEqual(self.servers['fast'].calls, 0)
+
+    def test_failure_falls_through_to_next_provider(self):
+        self.servers['fast'].fail = True
+        fast = self.provider('fast', samples=[0.01] * 10)
+        slow = self.provider('slow', samples=[0.5] * 10)
+        router = ProviderRouter([fast, slow], hedge=False)
+
+        completion = router.complete(MESSAGES)
+
+        self.assertEqual(completion.provider, 'slow')
+        self.assertEqual(fast.tracker.consecutive_failures, 1)
+
+    def test_all_providers_failing_raises(self):
+        for server in self.servers.values():
+            server.fail = True
+        router = ProviderRouter([self.provider('fast'), self.provider('slow')])
+
+        with self.assertRaises(ProviderError):
+            router.complete(MESSAGES)
+
+
+class HedgingTests(StubServerTestCase):
+
+    def test_hedge_fires_after_leader_p90(self):
+        self.servers['fast'].latency = 1.0
+        leader = self.provider('fast', samples=[0.05] * 10)
+        backup = self.provider('slow', samples=[0.2] * 10)
+        router = ProviderRouter([leader, backup])
+        self.assertAlmostEqual(router.hedge_delay(leader), 0.05)
+
+        started = time.monotonic()
+        completion = router.complete(MESSAGES)
+        elapsed = time.monotonic() - started
+
+        self.assertTrue(completion.hedged)
+        self.assertEqual(completion.provider, 'slow')
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(self.servers['slow'].calls, 1)
+
+    def test_no_hedge_when_leader_answers_within_p90(self):
+        leader = self.provider('fast', samples=[0.5] * 10)
+        backup = self.provider('slow', samples=[0.6] * 10)
+        router = ProviderRouter([leader, backup])
+
+        completion = router.complete(MESSAGES)
+
+        self.assertFalse(completion.hedged)
+        self.assertEqual(completion.provider, 'fast')
+        self.assertEqual(self.servers['slow'].calls, 0)
+
+    def test_first_answer_wins_even_if_leader(self):
+        # The leader misses its p90 but still beats the slower hedge.
+        self.servers['fast'].latency = 0.15
+        self.servers['slow'].latency = 1.0
+        leader = self.provider('fast', samples=[0.05] * 10)
+        backup = self.provider('slow', samples=[0.2] * 10)
+        router = ProviderRouter([leader, backup])
+
+        started = time.monotonic()
+        completion = router.complete(MESSAGES)
+        elapsed = time.monotonic() - started
+
+        self.assertTrue(completion.hedged)
+        self.assertEqual(completion.provider, 'fast')
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(self.servers['slow'].calls, 1)
+
+    def test_hedging_disabled(self):
+        self.servers['fast'].latency = 0.3
+        leader = self.provider('fast', samples=[0.05] * 10)
+        backup = self.provider('slow', samples=[0.2] * 10)
+        router = ProviderRouter([leader, backup], hedge=False)
+
+        completion = router.complete(MESSAGES)
+
+        self.assertFalse(completion.hedged)
+        self.assertEqual(completion.provider, 'fast')
+        self.assertEqual(self.servers['slow'].calls, 0)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch('tickets.llm_providers.time.monotonic', return_value=1000.0)
+        self.clock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_opens_after_consecutive_failures(self):
+        tracker = LatencyTracker(failure_threshold=3, cooldown=30)
+        tracker.record_failure()
+        tracker.record_failure()
+        self.assertTrue(tracker.healthy)
+
+        tracker.record_failure()
+        self.assertFalse(tracker.healthy)
+
+    def test_success_resets_failure_count(self):
+        tracker = LatencyTracker(failure_threshold=3, cooldown=30)
+        tracker.record_failure()
+        tracker.record_failure()
+        tracker.record_success(0.1)
+        tracker.record_failure()
+
+        self.assertTrue(tracker.healthy)
+
+    def test_half_open_after_cooldown(self):
+        tracker = LatencyTracker(failure_threshold=2, cooldown=30)
+        tracker.record_failure()
+        tracker.record_failure()
+
+        self.clock.return_value = 1029.0
+        self.assertFalse(tracker.healthy)
+        self.clock.return_value = 1030.0
+        self.assertTrue(tracker.healthy)
+
+        # The trial request fails: the breaker opens again for a full cooldown
+        tracker.record_failure()
+        self.assertFalse(tracker.healthy)
+        self.clock.return_value = 1059.0
+        self.assertFalse(tracker.healthy)
+
+        self.clock.return_value = 1060.0
+        tracker.record_success(0.1)
+        self.assertTrue(tracker.healthy)
+        self.assertEqual(tracker.consecutive_failures, 0)
@@ -0,0 +1,47 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tickets.models import Organization, Ticket
+from tickets.tests import clear_caches
+
+
+class NextTicketTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.client = APIClient()
+        self.organization, _ = Organization.objects.get_or_create(
+            slug='default', defaults={'name': 'Default', 'shard': 'default'}
+        )
+        for category, priority in (
+            (Ticket.CATEGORY_BILLING, Ticket.PRIORITY_LOW),
+            (Ticket.CATEGORY_TECHNICAL, Ticket.PRIORITY_CRITICAL),
+        ):
+            Ticket.objects.create(
+                organization=self.organization,
+                title=f'{category} ticket',
+                description='Something is wrong',
+                category=category,
+                priority=priority,
+            )
+
+    def test_claims_highest_priority_ticket(self):
+        response = self.client.post('/api/tickets/next/', {}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['category'], Ticket.CATEGORY_TECHNICAL)
+        self.assertEqual(response.data['status'], Ticket.STATUS_IN_PROGRESS)
+
+    def test_category_from_body_or_query(self):
+        response = self.client.post('/api/tickets/next/', {'category': 'billing'}, format='json')
+        self.assertEqual(response.data['category'], Ticket.CATEGORY_BILLING)
+
+        response = self.client.post('/api/tickets/next/?category=billing', format='json')
+        self.assertEqual(response.status_code, 204)
+
+    def test_malformed_input_is_400(self):
+        for body in ([1], {'category': ['billing']}, {'category': 'shipping'}, 'billing'):
+            with self.subTest(body=body):
+                response = self.client.post('/api/tickets/next/', body, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(Ticket.objects.filter(status=Ticket.STATUS_OPEN).count(), 2)
@@ -0,0 +1,73 @@
+from django.test import SimpleTestCase, override_settings
+
+from tickets.llm_service import LLMClassifier
+from tickets.prompting import (
+    CACHED_SYSTEM_PROMPT,
+    DEFAULT_EXAMPLES,
+    PROVIDER_CACHE_MIN_TOKENS,
+    REFERENCE_EXAMPLES,
+    SYSTEM_PROMPT,
+    ExamplePool,
+    PromptBuilder,
+)
+
+
+class EmptyPool(ExamplePool):
+    """No stored tickets: selection falls back to the built-in examples."""
+
+    def examples(self):
+        return []
+
+
+class PromptLayoutTests(SimpleTestCase):
+
+    def test_cached_prefix_is_shared_and_clears_provider_threshold(self):
+        builder = PromptBuilder(few_shot=2, pool=EmptyPool(), cache_prefix=True)
+        first, _ = builder.build("I was charged twice for my subscription this month")
+        second, _ = builder.build("The dashboard is loading very slowly, takes 30+ seconds")
+
+        self.assertEqual(first[0], second[0])
+        self.assertEqual(first[0]['content'], CACHED_SYSTEM_PROMPT)
+        self.assertTrue(CACHED_SYSTEM_PROMPT.startswith(SYSTEM_PROMPT))
+        # About four characters per BPE token for English text
+        self.assertGreater(len(CACHED_SYSTEM_PROMPT) / 4, PROVIDER_CACHE_MIN_TOKENS)
+        # Fallback few-shot messages must not repeat what the prefix already says
+        self.assertFalse({text for text, _, _ in DEFAULT_EXAMPLES} & {text for text, _, _ in REFERENCE_EXAMPLES})
+        self.assertGreaterEqual(builder.prefix_tokens(), PROVIDER_CACHE_MIN_TOKENS)
+
+    def test_relevant_examples_and_description_follow_the_prefix(self):
+        builder = PromptBuilder(few_shot=2, pool=EmptyPool(), cache_prefix=True)
+        messages, estimated = builder.build("I was charged twice for my subscription this month")
+
+        self.assertEqual([m['role'] for m in messages], ['system', 'user', 'assistant', 'user', 'assistant', 'user'])
+        self.assertEqual(messages[-1]['content'], "I was charged twice for my subscription this month")
+        self.assertIn('"category":"billing"', messages[2]['content'])
+        self.assertGreater(estimated, builder.prefix_tokens())
+
+    def test_compact_prefix_is_the_default(self):
+        builder = PromptBuilder(few_shot=0)
+        messages, _ = builder.build("How do I export my data?")
+
+        self.assertEqual(messages[0]['content'], SYSTEM_PROMPT)
+        self.assertEqual(len(messages), 2)
+        self.assertLess(builder.prefix_tokens(), PROVIDER_CACHE_MIN_TOKENS)
+
+
+class ProviderPaddingTests(SimpleTestCase):
+
+    @override_settings(
+        LLM_PROVIDERS={
+            'openai': {'kind': 'openai', 'api_key': 'key', 'model': 'gpt-4o-mini'},
+            'local': {'kind': 'local', 'base_url': 'http://127.0.0.1:1/v1', 'model': 'llama'},
+        },
+        LLM_PROMPT_CACHE_PREFIX_KINDS=['openai'],
+    )
+    def test_only_listed_provider_kinds_get_the_padded_prefix(self):
+        classifier = LLMClassifier()
+        providers = {provider.name: provider for provider in classifier.router.providers}
+        messages, _ = classifier.prompt_builder.build("How do I export my data?")
+
+        self.assertEqual(messages[0]['content'], SYSTEM_PROMPT)
+        self.assertEqual(providers['openai'].prepare(messages)[0]['content'], CACHED_SYSTEM_PROMPT)
+        self.assertEqual(providers['openai'].prepare(messages)[1:], messages[1:])
+        self.assertIs(providers['local'].prepare(messages), messages)
@@ -0,0 +1,189 @@
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.models import Permission, User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from tickets.models import Organization, OrganizationToken, Ticket
+from tickets.tenancy import SESSION_KEY
+from tickets.tests import clear_caches
+
+
+class TenantAccessTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.client = APIClient()
+        self.default, _ = Organization.objects.get_or_create(
+            slug='default', defaults={'name': 'Default', 'shard': 'default'}
+        )
+        self.acme = Organization.objects.create(slug='acme', name='Acme', shard='default')
+        for organization in (self.default, self.acme):
+            Ticket.objects.create(
+                organization=organization,
+                title=f'{organization.slug} ticket',
+                description='Something is wrong',
+                category=Ticket.CATEGORY_GENERAL,
+                priority=Ticket.PRIORITY_LOW,
+            )
+        self.user = User.objects.create_user('agent', password='secret')
+
+    def titles(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [ticket['title'] for ticket in response.data]
+
+    def token_for(self, organization):
+        token = f'{organization.slug}-token'
+        OrganizationToken.objects.create(
+            organization=organization, name='test', digest=OrganizationToken.digest_for(token)
+        )
+        return token
+
+    def test_anonymous_requests_only_reach_default_organization(self):
+        self.assertEqual(self.titles(self.client.get('/api/tickets/')), ['default ticket'])
+
+        response = self.client.get('/api/tickets/', HTTP_X_ORGANIZATION='acme')
+        self.assertEqual(response.status_code, 401)
+        # Existence of other organizations is not revealed either
+        response = self.client.get('/api/tickets/', HTTP_X_ORGANIZATION='missing')
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(TENANT_ANONYMOUS_ACCESS=False)
+    def test_anonymous_access_can_be_disabled(self):
+        response = self.client.get('/api/tickets/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+
+    def test_token_selects_its_organization(self):
+        token = self.token_for(self.acme)
+
+        response = self.client.get('/api/tickets/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(self.titles(response), ['acme ticket'])
+
+        response = self.client.get(
+            '/api/tickets/', HTTP_AUTHORIZATION=f'Bearer {token}', HTTP_X_ORGANIZATION='acme'
+        )
+        self.assertEqual(self.titles(response), ['acme ticket'])
+
+    def test_token_cannot_name_another_organization(self):
+        token = self.token_for(self.acme)
+
+        response = self.client.get(
+            '/api/tickets/', HTTP_AUTHORIZATION=f'Bearer {token}', HTTP_X_ORGANIZATION='default'
+        )
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.get('/api/tickets/', HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(response.status_code, 401)
+
+    def test_create_org_token_command(self):
+        out = StringIO()
+        call_command('create_org_token', 'acme', '--name', 'frontend', stdout=out)
+        token = out.getvalue().splitlines()[-1]
+
+        response = self.client.get('/api/tickets/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(self.titles(response), ['acme ticket'])
+        self.assertNotIn(token, OrganizationToken.objects.values_list('digest', flat=True))
+
+    def test_logged_in_user_needs_membership(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get('/api/tickets/', HTTP_X_ORGANIZATION='acme')
+        self.assertEqual(response.status_code, 403)
+
+        self.acme.members.add(self.user)
+        clear_caches()
+        response = self.client.get('/api/tickets/', HTTP_X_ORGANIZATION='acme')
+        self.assertEqual(self.titles(response), ['acme ticket'])
+
+    @override_settings(TENANT_ANONYMOUS_ACCESS=False)
+    def test_browser_logs_in_with_session_and_csrf(self):
+        self.acme.members.add(self.user)
+        client = APIClient(enforce_csrf_checks=True)
+        self.assertEqual(client.get('/api/auth/login/').status_code, 200)
+
+        response = client.post('/api/auth/login/', {
+            'username': 'agent',
+            'password': 'secret',
+            'csrfmiddlewaretoken': client.cookies['csrftoken'].value,
+        })
+        self.assertRedirects(response, settings.FRONTEND_URL, fetch_redirect_response=False)
+
+        ticket = {'title': 'New', 'description': 'Something is wrong', 'category': 'general', 'priority': 'low'}
+        response = client.post('/api/tickets/', ticket, format='json', HTTP_X_ORGANIZATION='acme')
+        self.assertEqual(response.status_code, 403)
+        response = client.post(
+            '/api/tickets/', ticket, format='json', HTTP_X_ORGANIZATION='acme',
+            HTTP_X_CSRFTOKEN=client.cookies['csrftoken'].value,
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_superuser_may_act_as_any_organization(self):
+        admin = User.objects.create_superuser('root', password='secret')
+        self.client.force_login(admin)
+
+        response = self.client.get('/api/tickets/', HTTP_X_ORGANIZATION='acme')
+        self.assertEqual(self.titles(response), ['acme ticket'])
+
+
+class AdminOrganizationTests(TestCase):
+
+    changelist = '/admin/tickets/ticket/'
+
+    def setUp(self):
+        clear_caches()
+        self.default, _ = Organization.objects.get_or_create(
+            slug='default', defaults={'name': 'Default', 'shard': 'default'}
+        )
+        self.acme = Organization.objects.create(slug='acme', name='Acme', shard='default')
+        for organization in (self.default, self.acme):
+            Ticket.objects.create(
+                organization=organization,
+                title=f'{organization.slug} ticket',
+                description='Something is wrong',
+                category=Ticket.CATEGORY_GENERAL,
+                priority=Ticket.PRIORITY_LOW,
+            )
+
+    def titles(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [ticket.title for ticket in response.context['cl'].result_list]
+
+    def test_selected_organization_is_kept_in_session(self):
+        self.client.force_login(User.objects.create_superuser('root', password='secret'))
+        self.assertEqual(self.titles(self.client.get(self.changelist)), ['default ticket'])
+
+        response = self.client.get(f'{self.changelist}?organization=acme&status__exact=open')
+
+        self.assertRedirects(response, f'{self.changelist}?status__exact=open')
+        self.assertEqual(self.client.session[SESSION_KEY], 'acme')
+        self.assertEqual(self.titles(self.client.get(self.changelist)), ['acme ticket'])
+
+        response = self.client.get(f'/admin/tickets/organization/{self.acme.pk}/change/')
+        self.assertEqual(response.status_code, 200)
+
+    def ticket_staff(self):
+        staff = User.objects.create_user('staff', password='secret', is_staff=True)
+        staff.user_permissions.set(Permission.objects.filter(content_type__model='ticket'))
+        return staff
+
+    def test_staff_cannot_select_organization_they_do_not_belong_to(self):
+        self.client.force_login(self.ticket_staff())
+
+        self.client.get(f'{self.changelist}?organization=acme')
+
+        self.assertNotIn(SESSION_KEY, self.client.session)
+        self.assertEqual(self.titles(self.client.get(self.changelist)), ['default ticket'])
+
+    @override_settings(TENANT_ANONYMOUS_ACCESS=False)
+    def test_changelist_is_empty_until_an_organization_is_picked(self):
+        staff = self.ticket_staff()
+        self.client.force_login(staff)
+
+        self.assertEqual(self.titles(self.client.get(self.changelist)), [])
+
+        self.acme.members.add(staff)
+        self.client.get(f'{self.changelist}?organization=acme')
+        self.assertEqual(self.titles(self.client.get(self.changelist)), ['acme ticket'])
@@ -0,0 +1,65 @@
+import threading
+import time
+from unittest import mock
+
+from django.db import connections
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+
+from tickets import analytics
+from tickets.models import Organization, Ticket, TicketEvent, TicketMetricDigest
+from tickets.tests import clear_caches
+
+
+class ConcurrentPatchTests(TransactionTestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.organization, _ = Organization.objects.get_or_create(
+            slug='default', defaults={'name': 'Default', 'shard': 'default'}
+        )
+        self.ticket = Ticket.objects.create(
+            organization=self.organization,
+            title='Cannot log in',
+            description='Password reset email never arrives',
+            category=Ticket.CATEGORY_ACCOUNT,
+            priority=Ticket.PRIORITY_HIGH,
+        )
+
+    def patch(self, status, responses):
+        try:
+            response = APIClient().patch(f'/api/tickets/{self.ticket.pk}/', {'status': status}, format='json')
+            responses.append(response.status_code)
+        finally:
+            connections.close_all()
+
+    def test_concurrent_status_changes_log_a_consistent_chain(self):
+        record = analytics.record_ticket_changes
+
+        def slow_record(ticket, previous):
+            # Widen the window between snapshot and commit
+            time.sleep(0.2)
+            return record(ticket, previous)
+
+        responses = []
+        with mock.patch.object(analytics, 'record_ticket_changes', slow_record):
+            threads = [
+                threading.Thread(target=self.patch, args=(status, responses))
+                for status in (Ticket.STATUS_IN_PROGRESS, Ticket.STATUS_RESOLVED)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(responses, [200, 200])
+        events = list(TicketEvent.objects.filter(ticket=self.ticket).order_by('id'))
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0].old_value, Ticket.STATUS_OPEN)
+        self.assertEqual(events[1].old_value, events[0].new_value)
+        first_responses = TicketMetricDigest.objects.filter(metric=TicketMetricDigest.METRIC_FIRST_RESPONSE)
+        self.assertEqual(sum(first_responses.values_list('count', flat=True)), 1)
+
+    def test_unknown_ticket_is_404(self):
+        response = APIClient().patch('/api/tickets/999999/', {'status': 'closed'}, format='json')
+        self.assertEqual(response.status_code, 404)
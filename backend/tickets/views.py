@@ -3,29 +3,48 @@ API Views for Support Ticket System.
 
 Implements all required endpoints:
 - POST /api/tickets/ - Create ticket
-- GET /api/tickets/ - List tickets with filters
+- POST /api/tickets/bulk/ - Create many tickets in one request
+- GET /api/tickets/ - List tickets with filters (?facets=true adds filter counts)
 - PATCH /api/tickets/<id>/ - Update ticket
 - GET /api/tickets/stats/ - Aggregated statistics
 - POST /api/tickets/classify/ - LLM classification
+- POST /api/tickets/next/ - Claim the next ticket from the work queue
+- GET /api/tickets/export/?format=csv|parquet|arrow - Streaming export
+
+Create, bulk create and classify honour the Idempotency-Key header. Every
+endpoint is scoped to the caller's organization (see ``tenancy``).
 """
 
 import logging
+from django.conf import settings
+from django.db import transaction
 from django.db.models import Avg, Count, Q
 from django.db.models.functions import TruncDate
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Ticket
+from .models import PRIORITY_RANK, Ticket
 from .serializers import (
     TicketSerializer,
     TicketUpdateSerializer,
     ClassificationRequestSerializer,
     ClassificationResponseSerializer,
+    NextTicketRequestSerializer,
     TicketStatsSerializer,
 )
+from .exporters import EXPORT_FORMATS, EXPORT_RENDERERS, iter_batches, pyarrow_available
+from .facets import ticket_facets
+from .filters import apply_ticket_filters
+from .idempotency import do_not_store, idempotent
+from .tenancy import get_current_organization, tenant_db, tenant_tickets
 from .llm_service import get_classifier
+from . import analytics, facets
 
 logger = logging.getLogger(__name__)
 
@@ -35,16 +54,30 @@ class TicketViewSet(viewsets.ModelViewSet):
     ViewSet for managing support tickets.
     
     Provides CRUD operations plus filtering, search, and statistics.
+    Every query is scoped to the request's organization and its shard.
     """
     queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
     
+    STATS_WINDOW_DAYS = 30
+    STATS_MAX_WINDOW_DAYS = 365
+    BULK_CREATE_MAX = 500
+    
     def get_serializer_class(self):
         """Use different serializer for partial updates."""
         if self.action == 'partial_update':
             return TicketUpdateSerializer
         return TicketSerializer
     
+    def perform_content_negotiation(self, request, force=False):
+        try:
+            return super().perform_content_negotiation(request, force)
+        except Http404:
+            if self.action != 'export':
+                raise
+            # Unknown ?format= on export: let export() answer 400 with the valid formats
+            return (JSONRenderer(), JSONRenderer.media_type)
+    
     def get_queryset(self):
         """
         Filter tickets based on query parameters.
@@ -57,33 +90,40 @@ class TicketViewSet(viewsets.ModelViewSet):
         
         All filters can be combined.
         """
-        queryset = Ticket.objects.all()
-        
-        # Filter by category
-        category = self.request.query_params.get('category')
-        if category:
-            queryset = queryset.filter(category=category)
-        
-        # Filter by priority
-        priority = self.request.query_params.get('priority')
-        if priority:
-            queryset = queryset.filter(priority=priority)
-        
-        # Filter by status
-        status_param = self.request.query_params.get('status')
-        if status_param:
-            queryset = queryset.filter(status=status_param)
-        
-        # Search in title and description
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | Q(description__icontains=search)
-            )
+        queryset = apply_ticket_filters(tenant_tickets(), self.request.query_params)
         
         # Always return newest first
         return queryset.order_by('-created_at')
     
+    def list(self, request, *args, **kwargs):
+        """
+        List tickets matching the filters, newest first.
+        
+        With ?facets=true the response becomes
+        {"results": [...], "facets": {"category": {...}, "priority": {...}, "status": {...}}}
+        where each facet counts tickets matching the other active filters.
+        """
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get('facets') in ('true', '1'):
+            response.data = {
+                'results': response.data,
+                'facets': ticket_facets(request.query_params),
+            }
+        return response
+    
+    def perform_create(self, serializer):
+        serializer.save(organization=get_current_organization())
+        facets.invalidate_on_commit()
+    
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        facets.invalidate_on_commit()
+    
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        facets.invalidate_on_commit()
+    
+    @idempotent('tickets.create')
     def create(self, request, *args, **kwargs):
         """
         Create a new ticket.
@@ -103,22 +143,164 @@ class TicketViewSet(viewsets.ModelViewSet):
             headers=headers
         )
     
+    @action(detail=False, methods=['post'], url_path='bulk')
+    @idempotent('tickets.bulk_create')
+    def bulk_create(self, request):
+        """
+        POST /api/tickets/bulk/
+        
+        Create up to BULK_CREATE_MAX tickets from a JSON list in a single
+        INSERT. The whole batch is rejected if any item is invalid.
+        
+        Returns 201 with the created tickets in request order.
+        """
+        if not isinstance(request.data, list):
+            return Response(
+                {'detail': 'Expected a list of tickets'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(request.data) > self.BULK_CREATE_MAX:
+            return Response(
+                {'detail': f"Cannot create more than {self.BULK_CREATE_MAX} tickets per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = TicketSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        
+        # Fields are already validated by the serializer; the table's check
+        # constraints still guard the insert.
+        organization = get_current_organization()
+        tickets = Ticket.objects.using(tenant_db()).bulk_create(
+            [Ticket(organization=organization, **item) for item in serializer.validated_data]
+        )
+        facets.invalidate_on_commit()
+        
+        logger.info(f"Bulk created {len(tickets)} tickets")
+        
+        return Response(
+            TicketSerializer(tickets, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+    
     def partial_update(self, request, *args, **kwargs):
         """
         Partially update a ticket (PATCH).
         
         Commonly used to change status or override LLM suggestions.
+        Every status/priority/category change is appended to the event log.
         """
-        instance = self.get_object()
-        serializer = self.get_serializer(instance, data=request.data, partial=True)
-        serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+        with transaction.atomic(using=tenant_db()):
+            # Lock the row before the snapshot so concurrent PATCHes queue up
+            # and each logs the value it actually replaced.
+            instance = get_object_or_404(
+                tenant_tickets().select_for_update(),
+                pk=kwargs[self.lookup_url_kwarg or self.lookup_field],
+            )
+            self.check_object_permissions(request, instance)
+            previous = analytics.snapshot(instance)
+            serializer = self.get_serializer(instance, data=request.data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            self.perform_update(serializer)
+            analytics.record_ticket_changes(instance, previous)
         
         logger.info(f"Updated ticket #{instance.id}")
         
         # Return full ticket data
         return Response(TicketSerializer(instance).data)
     
+    @action(detail=False, methods=['post'], url_path='next')
+    def next_ticket(self, request):
+        """
+        POST /api/tickets/next/
+        
+        Atomically claim the highest-priority, oldest open ticket and move it
+        to in_progress. Pass {"category": "billing"} (or ?category=) to pull
+        from a single category's queue.
+        
+        Uses SELECT ... FOR UPDATE SKIP LOCKED over the partial open-queue
+        indexes, so concurrent agents never receive the same ticket and
+        never wait on each other's row locks.
+        
+        Returns 200 with the claimed ticket, or 204 if the queue is empty.
+        """
+        input_serializer = NextTicketRequestSerializer(data=request.data or request.query_params)
+        if not input_serializer.is_valid():
+            return Response(
+                input_serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        category = input_serializer.validated_data.get('category')
+        
+        with transaction.atomic(using=tenant_db()):
+            queue = tenant_tickets().filter(status=Ticket.STATUS_OPEN)
+            if category:
+                queue = queue.filter(category=category)
+            ticket = (
+                queue.order_by(PRIORITY_RANK, 'created_at')
+                .select_for_update(skip_locked=True)
+                .first()
+            )
+            if ticket is None:
+                return Response(status=status.HTTP_204_NO_CONTENT)
+            
+            previous = analytics.snapshot(ticket)
+            ticket.status = Ticket.STATUS_IN_PROGRESS
+            ticket.updated_at = timezone.now()
+            # Row is already locked and the new status is a known constant,
+            # so skip full_clean() and issue a single UPDATE.
+            tenant_tickets().filter(pk=ticket.pk).update(
+                status=ticket.status,
+                updated_at=ticket.updated_at,
+            )
+            analytics.record_ticket_changes(ticket, previous)
+            facets.invalidate_on_commit()
+        
+        logger.info(f"Dispatched ticket #{ticket.id} ({ticket.priority}) from {category or 'all'} queue")
+        
+        return Response(TicketSerializer(ticket).data)
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='export',
+        renderer_classes=EXPORT_RENDERERS + [JSONRenderer],
+    )
+    def export(self, request):
+        """
+        GET /api/tickets/export/?format=csv|parquet|arrow
+        
+        Streams every ticket matching the list filters (category, priority,
+        status, search) in primary-key order. Rows are read through a
+        server-side cursor in batches of EXPORT_BATCH_SIZE and encoded per
+        batch (CSV chunks, Parquet row groups, Arrow record batches), so
+        worker memory does not grow with the table. The cursor's
+        transaction, and its snapshot, stays open until the download ends.
+        """
+        export_format = request.accepted_renderer.format
+        if export_format not in EXPORT_FORMATS:
+            return JsonResponse(
+                {'format': [f"Must be one of: {', '.join(EXPORT_FORMATS)}"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if export_format != 'csv' and not pyarrow_available():
+            return JsonResponse(
+                {'format': [f"{export_format} export requires pyarrow to be installed"]},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        
+        encoder, content_type, extension = EXPORT_FORMATS[export_format]
+        queryset = apply_ticket_filters(tenant_tickets(), request.query_params)
+        
+        logger.info(f"Streaming {export_format} export")
+        
+        response = StreamingHttpResponse(
+            encoder(iter_batches(queryset, settings.EXPORT_BATCH_SIZE)),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="tickets.{extension}"'
+        return response
+    
     @action(detail=False, methods=['get'], url_path='stats')
     def statistics(self, request):
         """
@@ -132,17 +314,38 @@ class TicketViewSet(viewsets.ModelViewSet):
             "open_tickets": 67,
             "avg_tickets_per_day": 8.3,
             "priority_breakdown": {"low": 30, "medium": 52, "high": 31, "critical": 11},
-            "category_breakdown": {"billing": 28, "technical": 55, "account": 22, "general": 19}
+            "category_breakdown": {"billing": 28, "technical": 55, "account": 22, "general": 19},
+            "durations": {
+                "resolution": {
+                    "by_category": {"billing": {"count": 12, "mean_seconds": 5400.0, "p50_seconds": ..., ...}},
+                    "by_priority": {...}
+                },
+                "first_response": {...}
+            }
         }
+        
+        Durations come from pre-aggregated digests over the last
+        ``?window_days=`` days (default 30, max 365).
         """
+        try:
+            window_days = int(request.query_params.get('window_days', self.STATS_WINDOW_DAYS))
+        except ValueError:
+            return Response(
+                {'window_days': ['Must be an integer']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        window_days = min(max(window_days, 1), self.STATS_MAX_WINDOW_DAYS)
+        
+        tickets = tenant_tickets()
+        
         # Total tickets count
-        total_tickets = Ticket.objects.count()
+        total_tickets = tickets.count()
         
         # Open tickets count
-        open_tickets = Ticket.objects.filter(status=Ticket.STATUS_OPEN).count()
+        open_tickets = tickets.filter(status=Ticket.STATUS_OPEN).count()
         
         # Priority breakdown - DB-level conditional aggregation
-        priority_breakdown = Ticket.objects.aggregate(
+        priority_breakdown = tickets.aggregate(
             low=Count('id', filter=Q(priority=Ticket.PRIORITY_LOW)),
             medium=Count('id', filter=Q(priority=Ticket.PRIORITY_MEDIUM)),
             high=Count('id', filter=Q(priority=Ticket.PRIORITY_HIGH)),
@@ -150,7 +353,7 @@ class TicketViewSet(viewsets.ModelViewSet):
         )
 
         # Category breakdown - DB-level conditional aggregation
-        category_breakdown = Ticket.objects.aggregate(
+        category_breakdown = tickets.aggregate(
             billing=Count('id', filter=Q(category=Ticket.CATEGORY_BILLING)),
             technical=Count('id', filter=Q(category=Ticket.CATEGORY_TECHNICAL)),
             account=Count('id', filter=Q(category=Ticket.CATEGORY_ACCOUNT)),
@@ -158,7 +361,7 @@ class TicketViewSet(viewsets.ModelViewSet):
         )
 
         # Average tickets per day - DB-level group-by + aggregate
-        daily_counts = Ticket.objects.annotate(
+        daily_counts = tickets.annotate(
             day=TruncDate('created_at')
         ).values('day').annotate(
             count=Count('id')
@@ -174,6 +377,7 @@ class TicketViewSet(viewsets.ModelViewSet):
             'avg_tickets_per_day': avg_tickets_per_day,
             'priority_breakdown': priority_breakdown,
             'category_breakdown': category_breakdown,
+            'durations': analytics.duration_summary(window_days, get_current_organization()),
         }
         
         serializer = TicketStatsSerializer(stats)
@@ -190,6 +394,8 @@ class ClassifyTicketView(APIView):
     Falls back gracefully if LLM is unavailable.
     """
     
+    # Not atomic: no transaction is held open while the LLM call runs.
+    @idempotent('tickets.classify', atomic=False)
     def post(self, request):
         """
         Classify a ticket description.
@@ -218,26 +424,30 @@ class ClassifyTicketView(APIView):
         # Get classifier and classify
         classifier = get_classifier()
         
+        # Fallback defaults are still a 200 for the UI, but are never stored
+        # under an Idempotency-Key: a retry should get a real classification.
         try:
             result = classifier.classify_ticket(description)
+            fallback = result.pop('fallback', False)
             
             # Validate output
             output_serializer = ClassificationResponseSerializer(data=result)
             if output_serializer.is_valid():
                 logger.info(f"Classification successful: {result}")
-                return Response(output_serializer.data, status=status.HTTP_200_OK)
+                response = Response(output_serializer.data, status=status.HTTP_200_OK)
+                return do_not_store(response) if fallback else response
             else:
                 logger.error(f"Invalid classification result: {output_serializer.errors}")
                 # Return defaults on validation failure
-                return Response({
+                return do_not_store(Response({
                     'suggested_category': 'general',
                     'suggested_priority': 'medium'
-                }, status=status.HTTP_200_OK)
+                }, status=status.HTTP_200_OK))
                 
         except Exception as e:
             logger.error(f"Classification error: {str(e)}", exc_info=True)
             # Graceful fallback
-            return Response({
+            return do_not_store(Response({
                 'suggested_category': 'general',
                 'suggested_priority': 'medium'
-            }, status=status.HTTP_200_OK)
+            }, status=status.HTTP_200_OK))
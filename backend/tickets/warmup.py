@@ -0,0 +1,70 @@
+"""
+Warm-up hooks for application server processes.
+
+A fresh worker pays for importing the URLconf (which pulls in DRF and
+every view), building the classifier and opening database connections on
+its first request. ``warm_up_process`` does the import-time work and runs
+from ``TicketsConfig.ready()``; with gunicorn's ``--preload`` that happens
+once in the master and is shared with every forked worker.
+``warm_up_worker`` opens connections and loads per-process caches; it runs
+in each worker after fork, because sockets must not be shared between
+processes. Django connections are per thread, so under gunicorn's gthread
+workers each request thread still opens its own on first use.
+
+Warm-up failures are logged and never stop a server from starting.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+WARM_PATHS = ('/api/tickets/', '/admin/')
+
+
+def warm_up_process() -> None:
+    """Import and build everything that does not need the database."""
+    started = time.monotonic()
+    try:
+        from rest_framework.settings import api_settings
+
+        resolver = get_resolver()
+        for path in WARM_PATHS:
+            resolver.resolve(path)
+        # DRF imports its renderer, parser and authentication classes lazily.
+        api_settings.DEFAULT_RENDERER_CLASSES
+        api_settings.DEFAULT_PARSER_CLASSES
+        api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        api_settings.DEFAULT_PERMISSION_CLASSES
+
+        from .llm_service import get_classifier
+        get_classifier()
+    except Exception as e:
+        logger.warning(f"Process warm-up failed: {e}")
+        return
+    logger.info(f"Process warm-up took {(time.monotonic() - started) * 1000:.0f} ms")
+
+
+def warm_up_worker() -> None:
+    """Open a connection to every shard and load the default tenant's caches."""
+    started = time.monotonic()
+    try:
+        for alias in dict.fromkeys(['default', *settings.TENANT_SHARDS]):
+            connections[alias].ensure_connection()
+
+        from .llm_service import get_classifier
+        from .tenancy import get_organization, tenant_context
+
+        classifier = get_classifier()
+        organization = get_organization(settings.DEFAULT_ORGANIZATION)
+        if classifier.is_configured and organization is not None:
+            with tenant_context(organization):
+                classifier.prompt_builder.warm()
+    except Exception as e:
+        logger.warning(f"Worker warm-up failed: {e}")
+        return
+    logger.info(f"Worker warm-up took {(time.monotonic() - started) * 1000:.0f} ms")
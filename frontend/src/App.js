@@ -5,16 +5,19 @@ import TicketList from './components/TicketList';
 import Filters from './components/Filters';
 import StatsDashboard from './components/StatsDashboard';
 import { useTickets } from './hooks/useTickets';
+import { LOGIN_URL } from './services/api';
 
 function App() {
   const {
     tickets,
+    facets,
     loading,
     error,
     filters,
     setFilters,
     createTicket,
     updateTicket,
+    claimNextTicket,
   } = useTickets();
 
   const [statsRefreshTrigger, setStatsRefreshTrigger] = useState(0);
@@ -31,6 +34,19 @@ function App() {
     setStatsRefreshTrigger((prev) => prev + 1);
   };
 
+  const handleClaimNext = async () => {
+    try {
+      const ticket = await claimNextTicket(filters.category);
+      if (!ticket) {
+        alert('No open tickets in this queue');
+        return;
+      }
+      setStatsRefreshTrigger((prev) => prev + 1);
+    } catch (err) {
+      alert('Failed to claim next ticket');
+    }
+  };
+
   return (
     <div className="app">
       <div className="container">
@@ -38,6 +54,7 @@ function App() {
           <p className="eyebrow">Operations Console</p>
           <h1>Support Ticket Dashboard</h1>
           <p>AI-assisted triage, lifecycle tracking, and live workload insights.</p>
+          <a className="header-link" href={LOGIN_URL}>Sign in to your organization</a>
           <div className="header-metrics">
             <div className="header-metric">
               <span>Visible Tickets</span>
@@ -57,10 +74,15 @@ function App() {
               onTicketCreated={handleTicketCreated}
             />
 
-            <Filters filters={filters} onFilterChange={setFilters} />
+            <Filters filters={filters} facets={facets} onFilterChange={setFilters} />
 
             <div className="card">
-              <h2 className="card-title">Ticket Queue ({tickets.length})</h2>
+              <div className="section-head">
+                <h2 className="card-title">Ticket Queue ({tickets.length})</h2>
+                <button className="btn btn-primary" onClick={handleClaimNext}>
+                  Claim next{filters.category ? ` (${filters.category})` : ''}
+                </button>
+              </div>
 
               {error && <div className="error-message">{error}</div>}
 
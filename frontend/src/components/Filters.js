@@ -1,6 +1,6 @@
 import React from 'react';
 
-const Filters = ({ filters, onFilterChange }) => {
+const Filters = ({ filters, facets, onFilterChange }) => {
   const handleChange = (e) => {
     const { name, value } = e.target;
     onFilterChange({
@@ -18,6 +18,12 @@ const Filters = ({ filters, onFilterChange }) => {
     });
   };
 
+  // Append the facet count (tickets matching the other filters) when known
+  const withCount = (field, value, label) => {
+    const count = facets?.[field]?.[value];
+    return count === undefined ? label : `${label} (${count})`;
+  };
+
   const hasActiveFilters =
     filters.category || filters.priority || filters.status || filters.search;
 
@@ -50,10 +56,10 @@ const Filters = ({ filters, onFilterChange }) => {
             onChange={handleChange}
           >
             <option value="">All Categories</option>
-            <option value="billing">Billing</option>
-            <option value="technical">Technical</option>
-            <option value="account">Account</option>
-            <option value="general">General</option>
+            <option value="billing">{withCount('category', 'billing', 'Billing')}</option>
+            <option value="technical">{withCount('category', 'technical', 'Technical')}</option>
+            <option value="account">{withCount('category', 'account', 'Account')}</option>
+            <option value="general">{withCount('category', 'general', 'General')}</option>
           </select>
         </div>
 
@@ -64,10 +70,10 @@ const Filters = ({ filters, onFilterChange }) => {
             onChange={handleChange}
           >
             <option value="">All Priorities</option>
-            <option value="low">Low</option>
-            <option value="medium">Medium</option>
-            <option value="high">High</option>
-            <option value="critical">Critical</option>
+            <option value="low">{withCount('priority', 'low', 'Low')}</option>
+            <option value="medium">{withCount('priority', 'medium', 'Medium')}</option>
+            <option value="high">{withCount('priority', 'high', 'High')}</option>
+            <option value="critical">{withCount('priority', 'critical', 'Critical')}</option>
           </select>
         </div>
 
@@ -78,10 +84,10 @@ const Filters = ({ filters, onFilterChange }) => {
             onChange={handleChange}
           >
             <option value="">All Statuses</option>
-            <option value="open">Open</option>
-            <option value="in_progress">In Progress</option>
-            <option value="resolved">Resolved</option>
-            <option value="closed">Closed</option>
+            <option value="open">{withCount('status', 'open', 'Open')}</option>
+            <option value="in_progress">{withCount('status', 'in_progress', 'In Progress')}</option>
+            <option value="resolved">{withCount('status', 'resolved', 'Resolved')}</option>
+            <option value="closed">{withCount('status', 'closed', 'Closed')}</option>
           </select>
         </div>
       </div>
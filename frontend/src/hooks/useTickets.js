@@ -3,6 +3,7 @@ import { ticketAPI } from '../services/api';
 
 export const useTickets = (initialFilters = {}) => {
   const [tickets, setTickets] = useState([]);
+  const [facets, setFacets] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [filters, setFilters] = useState(initialFilters);
@@ -12,8 +13,9 @@ export const useTickets = (initialFilters = {}) => {
     setError(null);
     
     try {
-      const data = await ticketAPI.getTickets(filters);
-      setTickets(data);
+      const data = await ticketAPI.getTickets(filters, { facets: true });
+      setTickets(data.results);
+      setFacets(data.facets);
     } catch (err) {
       setError(err.response?.data?.message || 'Failed to fetch tickets');
     } finally {
@@ -47,14 +49,30 @@ export const useTickets = (initialFilters = {}) => {
     }
   };
 
+  const claimNextTicket = async (category) => {
+    try {
+      const claimedTicket = await ticketAPI.claimNextTicket(category);
+      if (claimedTicket) {
+        setTickets(prev =>
+          prev.map(ticket => ticket.id === claimedTicket.id ? claimedTicket : ticket)
+        );
+      }
+      return claimedTicket;
+    } catch (err) {
+      throw new Error(err.response?.data?.message || 'Failed to claim ticket');
+    }
+  };
+
   return {
     tickets,
+    facets,
     loading,
     error,
     filters,
     setFilters,
     createTicket,
     updateTicket,
+    claimNextTicket,
     refresh: fetchTickets,
   };
 };
@@ -3,11 +3,26 @@ import axios from 'axios';
 // Configure axios instance
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
 
+// Session login page on the backend; it redirects back here afterwards
+export const LOGIN_URL = `${API_BASE_URL}/auth/login/`;
+
+// Organization (tenant) slug sent as X-Organization. The backend checks that the
+// logged-in user is a member; its default organization is used when unset
+const ORGANIZATION = process.env.REACT_APP_ORGANIZATION;
+
+// The browser authenticates with the backend session cookie, never with an API
+// token: anything in this bundle is readable by every visitor
 const api = axios.create({
   baseURL: API_BASE_URL,
   headers: {
     'Content-Type': 'application/json',
+    ...(ORGANIZATION ? { 'X-Organization': ORGANIZATION } : {}),
   },
+  withCredentials: true,
+  // Django requires the CSRF token on writes from a logged-in session
+  withXSRFToken: true,
+  xsrfCookieName: 'csrftoken',
+  xsrfHeaderName: 'X-CSRFToken',
   timeout: 30000,
 });
 
@@ -19,14 +34,16 @@ api.interceptors.response.use(
 
 // Ticket API functions
 export const ticketAPI = {
-  // Get all tickets with optional filters
-  getTickets: async (filters = {}) => {
+  // Get all tickets with optional filters.
+  // With { facets: true } the response is { results, facets }.
+  getTickets: async (filters = {}, { facets = false } = {}) => {
     const params = new URLSearchParams();
     
     if (filters.category) params.append('category', filters.category);
     if (filters.priority) params.append('priority', filters.priority);
     if (filters.status) params.append('status', filters.status);
     if (filters.search) params.append('search', filters.search);
+    if (facets) params.append('facets', 'true');
     
     const response = await api.get(`/tickets/?${params.toString()}`);
     return response.data;
@@ -44,6 +61,12 @@ export const ticketAPI = {
     return response.data;
   },
 
+  // Claim the next open ticket from the work queue (optionally one category)
+  claimNextTicket: async (category) => {
+    const response = await api.post('/tickets/next/', category ? { category } : {});
+    return response.status === 204 ? null : response.data;
+  },
+
   // Get ticket statistics
   getStats: async () => {
     const response = await api.get('/tickets/stats/');